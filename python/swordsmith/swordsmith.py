@@ -2,31 +2,79 @@ import utils
 
 import math
 import argparse
+import asyncio
+import inspect
 import time
 import os
 import re
+import queue
+import random
+import multiprocessing
+import mmap
+import struct
+import hashlib
+import json
+import sys
+import platform
+import tracemalloc
+import threading
+import urllib.request
+import urllib.error
 
 from abc import ABC, abstractmethod
-from random import shuffle
-from collections import defaultdict
+from bisect import bisect_left
+from heapq import heapify, heappop, heappush
+from collections import defaultdict, deque, Counter, OrderedDict
+from collections.abc import Mapping
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain, compress, count
+from operator import itemgetter, ne
 
 EMPTY = '.'
 BLOCK = ' '
 
+NOGOOD_LIMIT = 10000
+
+NEG_INF = float('-inf')
+
+ANIMATION_FPS = 30
+
+ASYNC_NODES_PER_YIELD = 100
+
+SCORE_MASK_CACHE_SIZE = 16
+
+EMPTY_BYTE = ord(EMPTY)
+
 
 class Crossword:
+    __slots__ = (
+        'slots',
+        'words',
+        'wordset',
+        'constraints',
+        'trail',
+        'slot_list',
+        'slot_ids',
+        'square_list',
+        'square_ids',
+        'slot_squares',
+        'square_slots',
+        'slot_crossings',
+        'slot_spans',
+        'slot_words',
+        'slot_empties',
+        'slot_constraints',
+        'letters',
+        'views',
+    )
+
     def __init__(self):
         self.slots = set()
         """set of slots in the puzzle"""
 
-        self.squares = defaultdict(lambda: defaultdict(int))
-        """square => slots that contain it => index of square in slot"""
-
-        self.crossings = defaultdict(lambda: defaultdict(tuple))
-        """slot => slots that cross it => tuple of squares where they cross"""
-
-        self.words = {}
-        """slot => word in that slot"""
+        self.words = CrosswordWords(self)
+        """slot => word in that slot, read from letters"""
 
         self.wordset = set()
         """set of filled words in puzzle"""
@@ -34,6 +82,76 @@ class Crossword:
         self.constraints = defaultdict(str)
         """slot => regex constraining words for that slot"""
 
+        self.trail = []
+        """list of (square, previous letter) for every square changed by put_word, used for undo"""
+
+        self.slot_list = []
+        """slot id => slot, where slot ids are dense ints in the order slots were added"""
+
+        self.slot_ids = {}
+        """slot => slot id"""
+
+        self.square_list = []
+        """square id => square, where square ids are dense ints in the order squares were first seen"""
+
+        self.square_ids = {}
+        """square => square id"""
+
+        self.slot_squares = []
+        """slot id => tuple of ids of its squares"""
+
+        self.square_slots = []
+        """square id => list of (slot id, index of square in slot) for slots that contain it"""
+
+        self.slot_crossings = []
+        """slot id => flat array of (crossing slot id, index in slot, index in crossing slot) for every crossing square"""
+
+        self.slot_spans = []
+        """slot id => slice of letters holding the slot's squares in order, or None if they aren't evenly spaced"""
+
+        self.slot_words = []
+        """slot id => word in that slot, or None if it hasn't been read since its letters changed"""
+
+        self.slot_empties = []
+        """slot id => number of EMPTY squares in the slot"""
+
+        self.slot_constraints = []
+        """slot id => regex constraining words for that slot"""
+
+        self.letters = bytearray()
+        """square id => letter in that square, as an ASCII byte"""
+
+        self.views = {}
+        """name => tuple-keyed view of the dense fields, built the first time it's asked for"""
+
+    @property
+    def squares(self):
+        """square => slots that contain it => index of square in slot"""
+        squares = self.views.get('squares')
+        if squares is None:
+            squares = self.views['squares'] = {
+                square: {
+                    self.slot_list[slot_id]: i
+                    for slot_id, i in self.square_slots[square_id]
+                }
+                for square_id, square in enumerate(self.square_list)
+            }
+        return squares
+
+    @property
+    def crossings(self):
+        """slot => slots that cross it => tuple of squares where they cross"""
+        crossings = self.views.get('crossings')
+        if crossings is None:
+            crossings = self.views['crossings'] = {}
+            for slot_id, slot in enumerate(self.slot_list):
+                slot_crossings = crossings[slot] = {}
+                triples = iter(self.slot_crossings[slot_id])
+                for crossing_id, i, _ in zip(triples, triples, triples):
+                    crossing_slot = self.slot_list[crossing_id]
+                    slot_crossings[crossing_slot] = slot_crossings.get(crossing_slot, ()) + (slot[i],)
+        return crossings
+
     def __str__(self):
         return '\n'.join(
             ', '.join(str(square) for square in slot) + ': ' + self.words[slot]
@@ -43,70 +161,163 @@ class Crossword:
     def clear(self):
         """Resets the crossword by clearing all fields"""
         self.slots.clear()
-        self.squares.clear()
-        self.crossings.clear()
-        self.words.clear()
         self.wordset.clear()
+        self.trail.clear()
+        self.slot_list.clear()
+        self.slot_ids.clear()
+        self.square_list.clear()
+        self.square_ids.clear()
+        self.slot_squares.clear()
+        self.square_slots.clear()
+        self.slot_crossings.clear()
+        self.slot_spans.clear()
+        self.slot_words.clear()
+        self.slot_empties.clear()
+        self.slot_constraints.clear()
+        self.letters.clear()
+        self.views.clear()
+
+    def add_square(self, square, letter=EMPTY):
+        """Adds a square containing letter if it isn't in the crossword yet, returns its id"""
+        square_id = self.square_ids.get(square)
+        if square_id is None:
+            square_id = self.square_ids[square] = len(self.square_list)
+            self.square_list.append(square)
+            self.square_slots.append([])
+            self.letters.append(ord(letter))
+            self.views.clear()
+        return square_id
 
-    def generate_crossings(self):
-        for square in self.squares:
-            for slot in self.squares[square]:
-                for crossing_slot in self.squares[square]:
-                    if slot != crossing_slot:
-                        if crossings_tuple := self.crossings[slot][crossing_slot]:
-                            self.crossings[slot][crossing_slot] = (
-                                *crossings_tuple,
-                                square,
-                            )
-                        else:
-                            self.crossings[slot][crossing_slot] = (square,)
-
-    def __put_letter_in_slot(self, letter, slot, i):
-        """Sets letter at the given index of the given slot"""
-        old_word = self.words[slot]
-        if i >= len(slot):
-            raise IndexError('Index greater than word length!')
-
-        if old_word[i] == letter:
-            # no change
-            return
+    def add_slot(self, squares, word):
+        """
+        Adds a slot made of the given squares containing word, generate_crossings should be called once all slots are added.
+        Squares already in the crossword keep their letters.
+        """
+        slot_id = len(self.slot_list)
+
+        square_ids = []
+        for i, (square, letter) in enumerate(zip(squares, word)):
+            square_id = self.add_square(square, letter)
+            self.square_slots[square_id].append((slot_id, i))
+            square_ids.append(square_id)
+        self.slot_squares.append(tuple(square_ids))
+
+        # slots that share a square share its tuple
+        slot = tuple(self.square_list[square_id] for square_id in square_ids)
+        self.slots.add(slot)
+        self.slot_list.append(slot)
+        self.slot_ids[slot] = slot_id
+
+        # evenly spaced squares, like those of across and down slots, can be read with one slice
+        step = square_ids[1] - square_ids[0] if len(square_ids) > 1 else 1
+        if step > 0 and square_ids == list(range(square_ids[0], square_ids[-1] + 1, step)):
+            self.slot_spans.append(slice(square_ids[0], square_ids[-1] + 1, step))
+        else:
+            self.slot_spans.append(None)
 
-        new_word = old_word[0:i] + letter + old_word[i + 1 :]
+        self.slot_words.append(None)
+        self.slot_empties.append(sum(self.letters[square_id] == EMPTY_BYTE for square_id in square_ids))
+        self.slot_constraints.append(self.constraints.get(slot, ''))
+        self.views.clear()
 
-        # update wordset
-        if old_word in self.wordset:
-            self.wordset.remove(old_word)
-        if self.is_word_filled(new_word):
-            self.wordset.add(new_word)
+        if not self.slot_empties[slot_id]:
+            self.wordset.add(self.slot_word(slot_id))
 
-        # update words for just this slot, not crossing slots
-        self.words[slot] = new_word
+    def generate_crossings(self):
+        """Finds, for every slot, the slots that share its squares"""
+        self.slot_crossings.clear()
+        for slot_id, square_ids in enumerate(self.slot_squares):
+            crossings = []
+            for i, square_id in enumerate(square_ids):
+                for crossing_id, crossing_i in self.square_slots[square_id]:
+                    if crossing_id != slot_id:
+                        crossings.append((crossing_id, i, crossing_i))
+
+            # slots that cross more than once have their squares next to each other
+            crossings.sort()
+            self.slot_crossings.append(array('i', chain.from_iterable(crossings)))
+        self.views.clear()
+
+    def slot_letters(self, slot_id):
+        """Returns a new bytearray of the letters in the slot with the given id"""
+        span = self.slot_spans[slot_id]
+        if span is not None:
+            return self.letters[span]
+        return bytearray(self.letters[square_id] for square_id in self.slot_squares[slot_id])
+
+    def slot_word(self, slot_id):
+        """Returns word in the slot with the given id, building it from letters if they changed since it was last read"""
+        word = self.slot_words[slot_id]
+        if word is None:
+            word = self.slot_words[slot_id] = self.slot_letters(slot_id).decode()
+        return word
+
+    def __put_letters(self, letters):
+        """Sets letters of the given square ids, which changes the word of every slot that contains them"""
+        slot_words = self.slot_words
+        slot_empties = self.slot_empties
+        filled_slot_ids = []
+
+        for square_id, letter in letters.items():
+            prev_letter = self.letters[square_id]
+            letter = ord(letter)
+            self.letters[square_id] = letter
+            empties = (letter == EMPTY_BYTE) - (prev_letter == EMPTY_BYTE)
+
+            for slot_id, _ in self.square_slots[square_id]:
+                word = slot_words[slot_id]
+                if word is not None:
+                    # words of filled slots are always built, so they can be taken out of the wordset
+                    if not slot_empties[slot_id]:
+                        self.wordset.discard(word)
+                    slot_words[slot_id] = None
+
+                slot_empties[slot_id] += empties
+                if not slot_empties[slot_id]:
+                    filled_slot_ids.append(slot_id)
+
+        # only slots that are filled once every letter is in need their words built now
+        for slot_id in filled_slot_ids:
+            if not slot_empties[slot_id] and slot_words[slot_id] is None:
+                self.wordset.add(self.slot_word(slot_id))
 
     def put_word(self, word, slot, wordlist_to_update=None):
         """Places word in the given slot, optionally adding it to the given wordlist"""
         if wordlist_to_update:
             wordlist_to_update.add_word(word)
 
-        prev_word = self.words[slot]
+        slot_id = self.slot_ids[slot]
+        prev_word = self.slot_word(slot_id)
+
+        # only touch squares whose letters change, recording their previous letters on the trail
+        letters = {}
+        for square_id, prev_letter, letter in zip(self.slot_squares[slot_id], prev_word, word):
+            if prev_letter != letter:
+                letters[square_id] = letter
+                self.trail.append((self.square_list[square_id], prev_letter))
 
-        # place word in words map and wordset
-        self.words[slot] = word
-        if self.is_word_filled(prev_word):
-            self.wordset.remove(prev_word)
-        if self.is_word_filled(word):
-            self.wordset.add(word)
+        self.__put_letters(letters)
 
-        # update crossing words
-        for crossing_slot in self.crossings[slot]:
-            for square in self.crossings[slot][crossing_slot]:
-                index = self.squares[square][slot]
-                crossing_index = self.squares[square][crossing_slot]
+    def mark(self):
+        """Returns position in the trail that undo can roll back to"""
+        return len(self.trail)
 
-                self.__put_letter_in_slot(word[index], crossing_slot, crossing_index)
+    def undo(self, mark):
+        """Restores every square changed since the given mark, returns the restored squares"""
+        squares = {}
+        while len(self.trail) > mark:
+            # pop latest change first, so the oldest letter of each square is kept
+            square, letter = self.trail.pop()
+            squares[square] = letter
+
+        self.__put_letters({self.square_ids[square]: letter for square, letter in squares.items()})
+        return squares.keys()
 
     def add_constraint(self, slot, regex):
         """Add regex constraint to a given slot"""
         self.constraints[slot] = regex
+        if slot in self.slot_ids:
+            self.slot_constraints[self.slot_ids[slot]] = regex
 
     def is_dupe(self, word):
         """Returns whether or not a given word is already in the grid"""
@@ -114,7 +325,7 @@ class Crossword:
 
     def is_filled(self):
         """Returns whether or not the whole crossword is filled"""
-        return all(Crossword.is_word_filled(word) for word in self.words.values())
+        return not any(self.slot_empties)
 
     def is_validly_filled(self, wordlist):
         """Returns whether the crossword is filled with words in the wordlist with no dupes"""
@@ -125,7 +336,7 @@ class Crossword:
         if not len(self.wordset) == len(self.words.values()):
             return False  # some dupes
         if not all(
-            re.search(constraint, self.words[slot])
+            wordlist.get_constraint(constraint, len(slot)).is_match(self.words[slot])
             for slot, constraint in self.constraints.items()
         ):
             return False  # some constraint violations
@@ -137,7 +348,27 @@ class Crossword:
         return EMPTY not in word
 
 
+class CrosswordWords(Mapping):
+    """Read-only mapping from slot to the word in that slot, read from the crossword's letters"""
+
+    __slots__ = ('crossword',)
+
+    def __init__(self, crossword):
+        self.crossword = crossword
+
+    def __getitem__(self, slot):
+        return self.crossword.slot_word(self.crossword.slot_ids[slot])
+
+    def __iter__(self):
+        return iter(self.crossword.slot_list)
+
+    def __len__(self):
+        return len(self.crossword.slot_list)
+
+
 class AmericanCrossword(Crossword):
+    __slots__ = ('rows', 'cols', 'grid')
+
     def __init__(self, rows, cols):
         super(AmericanCrossword, self).__init__()
 
@@ -196,7 +427,7 @@ class AmericanCrossword(Crossword):
         for row in range(self.rows):
             for col in range(self.cols):
                 increment_index = False
-                for slot in self.squares[(row, col)]:
+                for slot in self.squares.get((row, col), ()):
                     if self.is_across_slot(slot) and slot not in across_slots:
                         across_slots.add(slot)
                         across_words[square_index] = self.words[slot]
@@ -220,6 +451,11 @@ class AmericanCrossword(Crossword):
         self.__generate_grid_from_slots()
         return '\n'.join(' '.join([letter for letter in row]) for row in self.grid)
 
+    def get_grid(self):
+        """Returns list of rows of the grid as strings, the format read_grid and from_grid take"""
+        self.__generate_grid_from_slots()
+        return [''.join(row) for row in self.grid]
+
     def put_block(self, row, col):
         """Places block in certain square"""
         self.grid[row][col] = BLOCK
@@ -231,21 +467,15 @@ class AmericanCrossword(Crossword):
             self.grid[row][col] = BLOCK
         self.__generate_slots_from_grid()
 
-    def add_slot(self, squares, word):
-        slot = tuple(squares)
-        self.slots.add(slot)
-
-        for i, square in enumerate(squares):
-            self.squares[square][slot] = i
-
-        if Crossword.is_word_filled(word):
-            self.wordset.add(word)
-
-        self.words[slot] = word
-
     def __generate_slots_from_grid(self, all_checked=True):
         self.clear()
 
+        # give every square, blocks included, the id row * cols + col,
+        # so across slots are slices of letters with step 1 and down slots with step cols
+        for r in range(self.rows):
+            for c in range(self.cols):
+                self.add_square((r, c), self.grid[r][c])
+
         # generate across words
         for r in range(self.rows):
             word = ''
@@ -293,16 +523,10 @@ class AmericanCrossword(Crossword):
         self.generate_crossings()
 
 
-class Wordlist:
-    """Collection of words to be used for filling a crossword"""
-
-    def __init__(self, words):
-        self.words = set(words)
-        self.added_words = set()
-
-        # mapping from wildcard patterns to lists of matching words, used for memoization
-        self.pattern_matches = {}
+class SetIndex:
+    """Pattern index that stores, for each length, position and letter, the set of matching words"""
 
+    def __init__(self, words=()):
         # mapping from length to index to letter to wordset
         # this stores an n-letter word n times, so might be memory intensive but we'll see
         self.indices = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
@@ -310,41 +534,23 @@ class Wordlist:
         # mapping from length to wordset
         self.lengths = defaultdict(set)
 
-        self.__init_indices()
+        for word in words:
+            self.add(word)
 
-    def __init_indices(self):
-        for word in self.words:
-            self.__add_word_to_indices(word)
-
-    def __add_word_to_indices(self, word):
+    def add(self, word):
         length = len(word)
         self.lengths[length].add(word)
         for i, letter in enumerate(word):
             self.indices[length][i][letter].add(word)
 
-    def __remove_word_from_indices(self, word):
+    def remove(self, word):
         length = len(word)
         self.lengths[length].remove(word)
         for i, letter in enumerate(word):
             self.indices[length][i][letter].remove(word)
 
-    def add_word(self, word):
-        if word not in self.words:
-            self.words.add(word)
-            self.added_words.add(word)
-            self.__add_word_to_indices(word)
-
-    def remove_word(self, word):
-        if word in self.words:
-            self.words.remove(word)
-            self.__remove_word_from_indices(word)
-        if word in self.added_words:
-            self.added_words.remove(word)
-
-    def get_matches(self, pattern, regex):
-        if (pattern, regex) in self.pattern_matches:
-            return self.pattern_matches[(pattern, regex)]
-
+    def matches(self, pattern):
+        """Returns set of words matching the pattern"""
         length = len(pattern)
         indices = [
             self.indices[length][i][letter]
@@ -352,405 +558,2997 @@ class Wordlist:
             if letter != EMPTY
         ]
         if indices:
-            matches = set.intersection(*indices)
-        else:
-            matches = self.lengths[length]
-
-        if regex:
-            matches = [match for match in matches if re.search(regex, match)]
-
-        self.pattern_matches[(pattern, regex)] = matches
-
-        return matches
+            return set.intersection(*indices)
+        return self.lengths[length]
+
+    def count(self, pattern):
+        """Returns number of words matching the pattern"""
+        return len(self.matches(pattern))
+
+    def count_table(self, pattern):
+        """Returns, for each index of the pattern, mapping from letter to number of matching words with that letter there"""
+        matches = self.matches(pattern)
+        return [Counter(map(itemgetter(i), matches)) for i in range(len(pattern))]
+
+    def class_matches(self, length, letter_classes):
+        """Returns set of words of the given length with a letter from each index's letter class, see Constraint"""
+        if letter_classes is None:
+            return set()
+
+        indices = []
+        for i, letter_class in enumerate(letter_classes):
+            if letter_class is not None:
+                negated, letters = letter_class
+                words = self.indices[length][i]
+                indices.append(
+                    set().union(*(words[letter] for letter in list(words) if (letter in letters) != negated))
+                )
+        if indices:
+            return set.intersection(*indices)
+        return set(self.lengths[length])
 
 
-class RetryException(Exception):
-    """Exceeded retry time"""
+class BitsetIndex:
+    """
+    Pattern index that gives each word of a given length an integer id and stores,
+    for each length, position and letter, the bitset of ids of words with that letter there.
+    Matching a pattern is a few ANDs, and counting matches is a popcount.
+    """
 
+    def __init__(self, words=()):
+        # mapping from length to id to word, removed words leave a None behind
+        self.words = defaultdict(list)
+
+        # mapping from word to its id within its length
+        self.ids = {}
+
+        # mapping from length to index to letter to bitset of ids
+        self.bitsets = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+        # mapping from length to bitset of ids of words still in the index
+        self.masks = defaultdict(int)
+
+        self.__init_bitsets(words)
+
+    def __init_bitsets(self, words):
+        # set bits in bytearrays first, since growing big ints one bit at a time is quadratic
+        buffers = defaultdict(lambda: defaultdict(dict))
+        for word in sorted(set(words)):
+            length = len(word)
+            ids = self.words[length]
+            self.ids[word] = len(ids)
+            ids.append(word)
+
+        for length, ids in self.words.items():
+            num_bytes = len(ids) // 8 + 1
+            for word_id, word in enumerate(ids):
+                byte, bit = divmod(word_id, 8)
+                for i, letter in enumerate(word):
+                    buffer = buffers[length][i].get(letter)
+                    if buffer is None:
+                        buffer = buffers[length][i][letter] = bytearray(num_bytes)
+                    buffer[byte] |= 1 << bit
+            self.masks[length] = (1 << len(ids)) - 1
+
+        for length in buffers:
+            for i in buffers[length]:
+                for letter, buffer in buffers[length][i].items():
+                    self.bitsets[length][i][letter] = int.from_bytes(buffer, 'little')
+
+    def add(self, word):
+        if word in self.ids:
+            return
+        length = len(word)
+        word_id = len(self.words[length])
+        self.words[length].append(word)
+        self.ids[word] = word_id
 
-class Filler(ABC):
-    """Abstract base class containing useful methods for filling crosswords"""
+        bit = 1 << word_id
+        self.masks[length] |= bit
+        for i, letter in enumerate(word):
+            self.bitsets[length][i][letter] |= bit
 
-    @abstractmethod
-    def fill(self, crossword, wordlist, animate, retry_time=None):
-        """Fills the given crossword using some strategy"""
+    def remove(self, word):
+        word_id = self.ids.pop(word)
+        length = len(word)
+        self.words[length][word_id] = None
 
-    @staticmethod
-    def get_new_crossing_words(crossword, slot, word):
-        """
-        Returns list of (crossing slot, new word) that cross the given slot,
-        given a word to theoretically put in the slot. Excludes slots that were already filled.
-        """
-        new_crossing_words = []
+        bit = 1 << word_id
+        self.masks[length] &= ~bit
+        for i, letter in enumerate(word):
+            self.bitsets[length][i][letter] &= ~bit
 
-        for crossing_slot in crossword.crossings[slot]:
-            new_crossing_word = crossword.words[crossing_slot]
-            for square in crossword.crossings[slot][crossing_slot]:
-                index = crossword.squares[square][slot]
-                letter = word[index]
+    def bitset(self, length, i, letter):
+        """Returns bitset of ids of words of the given length with letter at index i"""
+        return self.bitsets[length][i][letter]
 
-                crossing_index = crossword.squares[square][crossing_slot]
-                crossing_word = crossword.words[crossing_slot]
+    def letters(self, length, i):
+        """Returns letters that may have a nonempty bitset at index i of words of the given length"""
+        return self.bitsets[length][i].keys()
 
-                new_crossing_word = (
-                    new_crossing_word[:crossing_index]
-                    + letter
-                    + new_crossing_word[crossing_index + 1 :]
-                )
+    def word(self, length, word_id):
+        """Returns word of the given length with the given id"""
+        return self.words[length][word_id]
 
-            if (
-                Crossword.is_word_filled(crossing_word)
-                and crossing_word == new_crossing_word
-            ):
-                # this word was already there, ignore
-                continue
+    def find(self, word):
+        """Returns id of the word, or None if it isn't in the index"""
+        return self.ids.get(word)
 
-            new_crossing_words.append((crossing_slot, new_crossing_word))
+    def mask(self, pattern):
+        """Returns bitset of ids of words matching the pattern"""
+        length = len(pattern)
+        bitsets = self.bitsets[length]
+        bits = self.masks[length]
+        for i, letter in enumerate(pattern):
+            if letter != EMPTY:
+                bits &= bitsets[i][letter]
+                if not bits:
+                    break
+        return bits
 
-        return new_crossing_words
+    def decode(self, length, bits):
+        """Returns set of words of the given length whose ids are in the bitset"""
+        # least significant bit first, as one selector byte per id
+        selectors = bin(bits)[:1:-1].encode().translate(BITS_TO_SELECTORS)
+        return set(compress(self.words[length], selectors))
 
-    @staticmethod
-    def is_valid_match(crossword, wordlist, slot, match):
-        """Returns whether the match can be placed in the slot without creating a dupe or invalid word."""
+    def matches(self, pattern):
+        """Returns set of words matching the pattern"""
+        return self.decode(len(pattern), self.mask(pattern))
 
-        if match not in wordlist.words:
-            return False  # match is invalid word
-        if crossword.is_dupe(match):
-            return False  # match is dupe
+    def count(self, pattern):
+        """Returns number of words matching the pattern"""
+        return popcount(self.mask(pattern))
 
-        new_crossing_words = Filler.get_new_crossing_words(crossword, slot, match)
+    def count_table(self, pattern, bits=None):
+        """
+        Returns, for each index of the pattern, mapping from letter to number of matching words with that letter there.
+        Counts only the words in bits if given, which must be a subset of the pattern's mask.
+        """
+        length = len(pattern)
+        if bits is None:
+            bits = self.mask(pattern)
+        table = []
+        for i, pattern_letter in enumerate(pattern):
+            counts = {}
+            if pattern_letter != EMPTY:
+                # every match has the pattern's letter here
+                if bits:
+                    counts[pattern_letter] = popcount(bits)
+            elif bits:
+                for letter in self.letters(length, i):
+                    num_words = popcount(bits & self.bitset(length, i, letter))
+                    if num_words:
+                        counts[letter] = num_words
+            table.append(counts)
+        return table
+
+    def score_mask(self, length, min_score, score):
+        """Returns bitset of ids of words of the given length that score at least min_score, looking scores up with score"""
+        words = self.words.get(length, ())
+        buffer = bytearray(len(words) // 8 + 1)
+        for word_id, word in enumerate(words):
+            if word is not None and score(word) >= min_score:
+                buffer[word_id >> 3] |= 1 << (word_id & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def class_matches(self, length, letter_classes):
+        """Returns set of words of the given length with a letter from each index's letter class, see Constraint"""
+        if letter_classes is None:
+            return set()
+
+        bits = self.mask(EMPTY * length)
+        for i, letter_class in enumerate(letter_classes):
+            if letter_class is not None:
+                negated, letters = letter_class
+                allowed = 0
+                for letter in self.letters(length, i):
+                    if (letter in letters) != negated:
+                        allowed |= self.bitset(length, i, letter)
+                bits &= allowed
+        return self.decode(length, bits)
+
+
+class CompiledIndex(BitsetIndex):
+    """
+    Read-only bitset index backed by a memory-mapped wordlist written by compile_wordlist.
+    Words and bitsets are read straight from the file when first needed, so opening it needs no parsing pass.
+    """
 
-        # make sure crossing words are valid
-        for _, crossing_word in new_crossing_words:
-            if (
-                Crossword.is_word_filled(crossing_word)
-                and crossing_word not in wordlist.words
-            ):
-                return False  # created invalid word
-            if crossword.is_dupe(crossing_word):
-                return False  # created dupe
+    def __init__(self, filepath):
+        with open(filepath, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-        # make sure crossing words don't dupe each other
-        if len(set(new_crossing_words)) != len(new_crossing_words):
-            return False
+        header = read_compiled_header(self.mm)
+        self.scored = header['scored']
+        self.min_score = header['min_score']
+        self.checksum = header['checksum']
+        self.alphabet = header['alphabet']
 
-        return True
+        # mapping from letter to its position in the alphabet of the file
+        self.letter_ids = {letter: i for i, letter in enumerate(self.alphabet)}
 
-    @staticmethod
-    def fewest_matches(crossword, wordlist):
-        """Finds the slot that has the fewest possible matches, this is probably the best next place to look."""
-        fewest_matches_slot = None
-        fewest_matches = len(wordlist.words) + 1
+        # mapping from length to (count, words offset, scores offset, bitsets offset)
+        self.tables = header['tables']
 
-        for slot in crossword.words:
-            word = crossword.words[slot]
-            if Crossword.is_word_filled(word):
-                continue
-            matches = len(wordlist.get_matches(word, crossword.constraints[slot]))
-            if matches < fewest_matches:
-                fewest_matches = matches
-                fewest_matches_slot = slot
-        return fewest_matches_slot, fewest_matches
+        # mapping from (length, index, letter) to bitset, filled in lazily from the file
+        self.bitsets = {}
 
-    @staticmethod
-    def minlook(crossword, wordlist, slot, matches, k):
-        """Considers given matches, returns index of the one that offers the most possible crossing words. If there are none, returns -1"""
-        match_indices = range(min(k, len(matches)))  # just take first k matches
-        failed_indices = set()
+        # mapping from word to score, filled in lazily from the file
+        self.scores = {}
 
-        best_match_index = -1
-        best_cross_product = -1
+        self.masks = {
+            length: (1 << count) - 1 for length, (count, *_) in self.tables.items()
+        }
 
-        for match_index in match_indices:
-            cross_product = 0
+    def add(self, word):
+        raise TypeError('Compiled wordlists are read-only')
 
-            for crossing_slot, crossing_word in Filler.get_new_crossing_words(
-                crossword, slot, matches[match_index]
-            ):
-                num_matches = len(
-                    wordlist.get_matches(
-                        crossing_word, crossword.constraints[crossing_slot]
-                    )
-                )
+    def remove(self, word):
+        raise TypeError('Compiled wordlists are read-only')
 
-                # if no matches for some crossing slot, give up and move on
-                # this is basically "arc-consistency lookahead"
-                if num_matches == 0:
-                    failed_indices.add(match_index)
-                    cross_product = float('-inf')
-                    break
+    def bitset(self, length, i, letter):
+        """Returns bitset of ids of words of the given length with letter at index i"""
+        key = (length, i, letter)
+        if key in self.bitsets:
+            return self.bitsets[key]
 
-                # use log product to avoid explosions
-                cross_product += math.log(num_matches)
+        bits = 0
+        if length in self.tables and letter in self.letter_ids:
+            count, _, _, bitsets_offset = self.tables[length]
+            num_bytes = count // 8 + 1
+            start = bitsets_offset + (i * len(self.alphabet) + self.letter_ids[letter]) * num_bytes
+            bits = int.from_bytes(self.mm[start : start + num_bytes], 'little')
 
-            if cross_product > best_cross_product:
-                best_match_index = match_index
-                best_cross_product = cross_product
+        self.bitsets[key] = bits
+        return bits
 
-        return best_match_index, failed_indices
+    def letters(self, length, i):
+        """Returns letters that may have a nonempty bitset at index i of words of the given length"""
+        return self.alphabet
 
+    def mask(self, pattern):
+        """Returns bitset of ids of words matching the pattern"""
+        length = len(pattern)
+        bits = self.masks.get(length, 0)
+        for i, letter in enumerate(pattern):
+            if letter != EMPTY:
+                bits &= self.bitset(length, i, letter)
+                if not bits:
+                    break
+        return bits
+
+    def word(self, length, word_id):
+        """Returns word of the given length with the given id"""
+        start = self.tables[length][1] + word_id * length
+        return self.mm[start : start + length].decode('ascii')
+
+    def decode(self, length, bits):
+        """Returns set of words of the given length whose ids are in the bitset"""
+        if not bits:
+            return set()
+        selectors = bin(bits)[:1:-1].encode().translate(BITS_TO_SELECTORS)
+        return {
+            self.word(length, word_id)
+            for word_id in compress(range(self.tables[length][0]), selectors)
+        }
+
+    def find(self, word):
+        """Returns id of the word, or None if it isn't in the index"""
+        length = len(word)
+        if length not in self.tables:
+            return None
+        try:
+            key = word.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+
+        count, words_offset, _, _ = self.tables[length]
+
+        # words of each length are sorted, so binary search the fixed-width records
+        records = CompiledRecords(self.mm, words_offset, length, count)
+        word_id = bisect_left(records, key)
+        if word_id < count and records[word_id] == key:
+            return word_id
+        return None
 
-class DFSFiller(Filler):
-    """
-    Fills the crossword using a naive DFS algorithm:
+    def score(self, word):
+        """Returns score of the word, or None if it isn't in the index"""
+        if word in self.scores:
+            return self.scores[word]
+
+        score = None
+        word_id = self.find(word)
+        if word_id is not None:
+            scores_offset = self.tables[len(word)][2]
+            score = struct.unpack_from('<H', self.mm, scores_offset + 2 * word_id)[0]
+
+        self.scores[word] = score
+        return score
+
+    def count_at_least(self, min_score):
+        """Returns number of words scoring at least min_score, read from the score tables without reading any words"""
+        return sum(
+            sum(score >= min_score for score in struct.unpack_from(f'<{count}H', self.mm, scores_offset))
+            for count, _, scores_offset, _ in self.tables.values()
+        )
 
-    - keeps selecting unfilled slot with fewest possible matches
-    - randomly chooses matching word for that slot
-    - backtracks if there is a slot with no matches
-    """
+    def score_levels(self):
+        """Returns sorted list of the distinct scores of the words, read from the score tables without reading any words"""
+        return sorted(
+            set().union(*(struct.unpack_from(f'<{count}H', self.mm, scores_offset) for count, _, scores_offset, _ in self.tables.values()))
+        )
 
-    def fill(self, crossword, wordlist, animate, retry_time=None):
-        if retry_time and time.time() > retry_time:
-            raise RetryException()
+    def score_mask(self, length, min_score, score=None):
+        """Returns bitset of ids of words of the given length that score at least min_score, read from the score tables"""
+        if length not in self.tables:
+            return 0
+        count, _, scores_offset, _ = self.tables[length]
+        buffer = bytearray(count // 8 + 1)
+        for word_id, word_score in enumerate(struct.unpack_from(f'<{count}H', self.mm, scores_offset)):
+            if word_score >= min_score:
+                buffer[word_id >> 3] |= 1 << (word_id & 7)
+        return int.from_bytes(buffer, 'little')
 
-        if animate:
-            utils.clear_terminal()
-            print(crossword)
 
-        # if the grid is filled, succeed if every word is valid and otherwise fail
-        if crossword.is_filled():
-            return True
+class CompiledRecords:
+    """Sequence view of count fixed-width records in a memory map, used for binary search"""
 
-        # choose slot with fewest matches
-        slot, num_matches = Filler.fewest_matches(crossword, wordlist)
+    def __init__(self, mm, offset, width, count):
+        self.mm = mm
+        self.offset = offset
+        self.width = width
+        self.count = count
 
-        # if some slot has zero matches, fail
-        if num_matches == 0:
-            return False
+    def __len__(self):
+        return self.count
 
-        # iterate through all possible matches in the fewest-match slot
-        previous_word = crossword.words[slot]
-        matches = wordlist.get_matches(
-            crossword.words[slot], crossword.constraints[slot]
-        )
+    def __getitem__(self, i):
+        start = self.offset + i * self.width
+        return self.mm[start : start + self.width]
 
-        # randomly shuffle matches
-        matches = list(matches)
-        shuffle(matches)
 
-        for match in matches:
-            if not Filler.is_valid_match(crossword, wordlist, slot, match):
-                continue
+class CompiledWords:
+    """Read-only set of the words in a CompiledIndex"""
 
-            crossword.put_word(match, slot)
+    def __init__(self, index):
+        self.index = index
 
-            if self.fill(crossword, wordlist, animate, retry_time):
-                return True
+    def __contains__(self, word):
+        return self.index.find(word) is not None
 
-        # if no match works, restore previous word
-        crossword.put_word(previous_word, slot)
+    def __len__(self):
+        return sum(count for count, *_ in self.index.tables.values())
 
-        return False
+    def __iter__(self):
+        for length, (count, *_) in sorted(self.index.tables.items()):
+            for word_id in range(count):
+                yield self.index.word(length, word_id)
 
 
-class DFSBackjumpFiller(Filler):
+class SessionBitsetIndex(BitsetIndex):
     """
-    Fills the crossword using a naive DFS algorithm:
-
-    - keeps selecting unfilled slot with fewest possible matches
-    - randomly chooses matching word for that slot
-    - backtracks if there is a slot with no matches
-
-    Each iteration returns (is_filled, failed_slot)
+    Bitset index of a WordlistSession, overlaid on its base's index instead of copying it.
+    Removed words of the base are masked out per length, and added words get ids after the base's,
+    so an edited session only stores bitsets for its own edits.
     """
 
-    def fill(self, crossword, wordlist, animate, retry_time=None):
-        if retry_time and time.time() > retry_time:
-            raise RetryException()
-
-        if animate:
-            utils.clear_terminal()
-            print(crossword)
+    def __init__(self, base):
+        self.base = base
 
-        # if the grid is filled, succeed if every word is valid and otherwise fail
-        if crossword.is_filled():
-            return True, None
+        # mapping from length to number of ids the base uses, after which added words get theirs
+        self.offsets = {}
 
-        # choose slot with fewest matches
-        slot, num_matches = Filler.fewest_matches(crossword, wordlist)
+        # mapping from length to bitset of ids of the base's words removed in the session
+        self.removed = defaultdict(int)
 
-        # if some slot has zero matches, fail
-        if num_matches == 0:
-            return False, slot
+        # mapping from length to id past the offset to added word, removed words leave a None behind
+        self.words = defaultdict(list)
 
-        # iterate through all possible matches in the fewest-match slot
-        previous_word = crossword.words[slot]
-        matches = wordlist.get_matches(
-            crossword.words[slot], crossword.constraints[slot]
-        )
+        # mapping from added word to its id
+        self.ids = {}
 
-        # randomly shuffle matches
-        matches = list(matches)
-        shuffle(matches)
+        # mapping from length to index to letter to bitset of ids of added words
+        self.bitsets = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
 
-        for match in matches:
-            if not Filler.is_valid_match(crossword, wordlist, slot, match):
-                continue
+        # mapping from edited length to bitset of ids of words in the session
+        self.masks = {}
 
-            crossword.put_word(match, slot)
+    def offset(self, length):
+        """Returns number of ids the base uses for words of the given length"""
+        if length not in self.offsets:
+            self.offsets[length] = self.base.masks.get(length, 0).bit_length()
+        return self.offsets[length]
 
-            is_filled, failed_slot = self.fill(crossword, wordlist, animate, retry_time)
-            if is_filled:
-                return True, None
-            if failed_slot not in crossword.crossings[slot]:
-                # undo this word, keep backjumping
-                crossword.put_word(previous_word, slot)
-                return False, failed_slot
+    def add(self, word):
+        length = len(word)
+        if word in self.ids:
+            return
+        if length not in self.masks:
+            self.masks[length] = self.base.masks.get(length, 0)
+        word_id = self.base.find(word)
+        if word_id is not None:
+            self.removed[length] &= ~(1 << word_id)
+        else:
+            word_id = self.offset(length) + len(self.words[length])
+            self.words[length].append(word)
+            self.ids[word] = word_id
+            bit = 1 << word_id
+            for i, letter in enumerate(word):
+                self.bitsets[length][i][letter] |= bit
+        self.masks[length] |= 1 << word_id
+
+    def remove(self, word):
+        length = len(word)
+        if length not in self.masks:
+            self.masks[length] = self.base.masks.get(length, 0)
+        word_id = self.ids.pop(word, None)
+        if word_id is not None:
+            self.words[length][word_id - self.offset(length)] = None
+            for i, letter in enumerate(word):
+                self.bitsets[length][i][letter] &= ~(1 << word_id)
+        else:
+            word_id = self.base.find(word)
+            self.removed[length] |= 1 << word_id
+        self.masks[length] &= ~(1 << word_id)
+
+    def bitset(self, length, i, letter):
+        """Returns bitset of ids of words of the given length with letter at index i, including removed words of the base"""
+        bits = self.base.bitset(length, i, letter)
+        if length in self.bitsets:
+            bits |= self.bitsets[length][i].get(letter, 0)
+        return bits
+
+    def letters(self, length, i):
+        """Returns letters that may have a nonempty bitset at index i of words of the given length"""
+        if length not in self.bitsets:
+            return self.base.letters(length, i)
+        return set(self.base.letters(length, i)) | self.bitsets[length][i].keys()
+
+    def word(self, length, word_id):
+        """Returns word of the given length with the given id"""
+        offset = self.offset(length)
+        if word_id < offset:
+            return self.base.word(length, word_id)
+        return self.words[length][word_id - offset]
+
+    def find(self, word):
+        """Returns id of the word, or None if it isn't in the session"""
+        if word in self.ids:
+            return self.ids[word]
+        word_id = self.base.find(word)
+        if word_id is None or self.removed[len(word)] >> word_id & 1:
+            return None
+        return word_id
+
+    def mask(self, pattern):
+        """Returns bitset of ids of words matching the pattern"""
+        length = len(pattern)
+        if length not in self.masks:
+            return self.base.mask(pattern)
+
+        bits = self.masks[length]
+        for i, letter in enumerate(pattern):
+            if letter != EMPTY:
+                bits &= self.bitset(length, i, letter)
+                if not bits:
+                    break
+        return bits
 
-        # if no match works, restore previous word
-        crossword.put_word(previous_word, slot)
-        return False, slot
+    def decode(self, length, bits):
+        """Returns set of words of the given length whose ids are in the bitset"""
+        offset = self.offset(length)
+        words = self.base.decode(length, bits & ((1 << offset) - 1))
+        added_bits = bits >> offset
+        if added_bits:
+            selectors = bin(added_bits)[:1:-1].encode().translate(BITS_TO_SELECTORS)
+            words.update(compress(self.words[length], selectors))
+        return words
 
 
-class MinlookFiller(Filler):
+class TrieIndex:
     """
-    Fills the crossword using a dfs algorithm with minlook heuristic:
-    - keeps selecting unfilled slot with fewest possible matches
-    - considers k random matching word, chooses word with the most possible crossing words (product of # in each slot)
-    - backtracks if there is a slot with no matches
+    Pattern index that stores the words of each length in a trie, laid out level by level in flat arrays.
+    Nodes are numbered in breadth-first order, so the children of a run of consecutive nodes are themselves
+    consecutive. A wildcard maps a range of nodes to the range of their children, and a letter is found
+    among the children by searching their labels, so a pattern never visits nodes it can't match.
+    The trie can't be changed once built, so words added and removed afterwards are kept alongside it.
     """
 
-    def __init__(self, k):
-        self.k = k
+    def __init__(self, words=()):
+        # mapping from letter to its code in the labels
+        self.letter_ids = {}
 
-    def fill(self, crossword, wordlist, animate, retry_time=None):
-        if retry_time and time.time() > retry_time:
-            raise RetryException()
+        # mapping from length to bytearray of the letter code of each node, the root's is unused
+        self.labels = {}
 
-        if animate:
-            utils.clear_terminal()
-            print(crossword)
+        # mapping from length to array of the id of the first child of each node, up to and including the first leaf
+        # so the children of node n are the ids from first[n] up to first[n + 1]
+        self.first = {}
 
-        # if the grid is filled, succeed
-        if crossword.is_filled():
-            return True
+        # mapping from length to id of the first leaf, leaves are words in sorted order
+        self.leaf_starts = {}
 
-        # choose slot with fewest matches
-        slot, num_matches = Filler.fewest_matches(crossword, wordlist)
+        # mapping from length to sorted list of words in the trie
+        self.words = {}
 
-        # if some slot has zero matches, fail
-        if num_matches == 0:
-            return False
+        # mapping from length to words added or removed since the trie was built
+        self.added = defaultdict(set)
+        self.removed = defaultdict(set)
+
+        by_length = defaultdict(list)
+        for word in set(words):
+            by_length[len(word)].append(word)
+            for letter in word:
+                self.letter_ids.setdefault(letter, len(self.letter_ids))
+
+        if len(self.letter_ids) > 256:
+            raise ValueError('Trie index supports at most 256 distinct letters')
+
+        table = {ord(letter): letter_id for letter, letter_id in self.letter_ids.items()}
+        for length, length_words in by_length.items():
+            length_words.sort()
+            self.words[length] = length_words
+            self.__build(length, [word.translate(table).encode('latin-1') for word in length_words])
+
+    def __build(self, length, codes):
+        """Builds the trie of the given length from its sorted words, translated to letter codes"""
+        # length of the prefix each word shares with the one before it, so word i starts a node at depth d if lcp[i] < d
+        lcp = [-1]
+        for previous, word in zip(codes, codes[1:]):
+            common = 0
+            while word[common] == previous[common]:
+                common += 1
+            lcp.append(common)
+
+        labels = bytearray(1)
+        first = array('i')
+        starts = [0]
+        for depth in range(length):
+            # words starting each node of the next level, whose first children start at the same words
+            next_starts = [i for i in range(len(codes)) if lcp[i] <= depth]
+            next_id = len(labels)
+            first.extend(next_id + j for j, i in enumerate(next_starts) if lcp[i] < depth)
+            labels.extend(codes[i][depth] for i in next_starts)
+            starts = next_starts
+        first.append(len(labels))
+
+        self.labels[length] = labels
+        self.first[length] = first
+        self.leaf_starts[length] = len(labels) - len(starts)
+
+    def add(self, word):
+        length = len(word)
+        if word in self.removed[length]:
+            self.removed[length].remove(word)
+        else:
+            self.added[length].add(word)
 
-        # iterate through all possible matches in the fewest-match slot
-        previous_word = crossword.words[slot]
-        matches = wordlist.get_matches(
-            crossword.words[slot], crossword.constraints[slot]
-        )
+    def remove(self, word):
+        length = len(word)
+        if word in self.added[length]:
+            self.added[length].remove(word)
+        else:
+            self.removed[length].add(word)
 
-        # randomly shuffle matches
-        matches = list(matches)
-        shuffle(matches)
+    def ranges(self, length, allowed):
+        """
+        Returns list of (start, stop) ranges of ids of words in the trie of the given length whose letter at each index i
+        is one of the codes in allowed[i], or any letter if allowed[i] is None
+        """
+        if length not in self.labels:
+            return []
+        labels = self.labels[length]
+        first = self.first[length]
+
+        nodes = [(0, 1)]
+        for codes in allowed:
+            if codes is None:
+                # children of consecutive nodes are consecutive
+                nodes = [(first[start], first[stop]) for start, stop in nodes]
+                continue
 
-        while matches:
-            match_index, failed_indices = Filler.minlook(
-                crossword, wordlist, slot, matches, self.k
-            )
+            next_nodes = []
+            for start, stop in nodes:
+                children_start = first[start]
+                children_stop = first[stop]
+                for code in codes:
+                    child = labels.find(code, children_start, children_stop)
+                    while child != -1:
+                        next_nodes.append((child, child + 1))
+                        child = labels.find(code, child + 1, children_stop)
+            if not next_nodes:
+                return []
+            nodes = next_nodes
+
+        leaf_start = self.leaf_starts[length]
+        return [(start - leaf_start, stop - leaf_start) for start, stop in nodes]
+
+    def decode(self, length, ranges):
+        """Returns set of words of the given length in the ranges of ids"""
+        words = self.words[length]
+        return set(chain.from_iterable(words[start:stop] for start, stop in ranges))
+
+    def pattern_codes(self, pattern):
+        """Returns allowed letter codes at each index of the pattern for ranges, or None if some letter isn't in the trie"""
+        allowed = []
+        for letter in pattern:
+            if letter == EMPTY:
+                allowed.append(None)
+            elif letter in self.letter_ids:
+                allowed.append(bytes((self.letter_ids[letter],)))
+            else:
+                return None
+        return allowed
+
+    def matches(self, pattern):
+        """Returns set of words matching the pattern"""
+        length = len(pattern)
+        allowed = self.pattern_codes(pattern)
+        matches = self.decode(length, self.ranges(length, allowed)) if allowed is not None else set()
 
-            if match_index != -1:
-                match = matches[match_index]
+        if self.removed[length]:
+            matches -= self.removed[length]
+        if self.added[length]:
+            matches.update(word for word in self.added[length] if PatternCache.is_match(pattern, word))
+        return matches
 
-            # remove failed matches and chosen match
-            matches = [
-                matches[i]
-                for i in range(len(matches))
-                if i != match_index and i not in failed_indices
-            ]
+    def count(self, pattern):
+        """Returns number of words matching the pattern"""
+        length = len(pattern)
+        if self.added[length] or self.removed[length]:
+            return len(self.matches(pattern))
+
+        allowed = self.pattern_codes(pattern)
+        if allowed is None:
+            return 0
+        return sum(stop - start for start, stop in self.ranges(length, allowed))
+
+    def count_table(self, pattern):
+        """Returns, for each index of the pattern, mapping from letter to number of matching words with that letter there"""
+        matches = self.matches(pattern)
+        return [Counter(map(itemgetter(i), matches)) for i in range(len(pattern))]
+
+    def class_matches(self, length, letter_classes):
+        """Returns set of words of the given length with a letter from each index's letter class, see Constraint"""
+        if letter_classes is None:
+            return set()
+
+        allowed = []
+        for letter_class in letter_classes:
+            if letter_class is None:
+                allowed.append(None)
+            else:
+                negated, letters = letter_class
+                allowed.append(bytes(
+                    letter_id for letter, letter_id in self.letter_ids.items() if (letter in letters) != negated
+                ))
+        matches = self.decode(length, self.ranges(length, allowed))
+
+        if self.removed[length]:
+            matches -= self.removed[length]
+        for word in self.added[length]:
+            if all(
+                letter_class is None or (letter in letter_class[1]) != letter_class[0]
+                for letter, letter_class in zip(word, letter_classes)
+            ):
+                matches.add(word)
+        return matches
 
-            # if no matches were found, try another batch if possible
-            if match_index == -1:
-                continue
 
-            if not Filler.is_valid_match(crossword, wordlist, slot, match):
-                continue
+BITS_TO_SELECTORS = bytes.maketrans(b'01', b'\x00\x01')
 
-            crossword.put_word(match, slot)
+INDEXES = {
+    'set': SetIndex,
+    'bitset': BitsetIndex,
+    'trie': TrieIndex,
+}
 
-            if self.fill(crossword, wordlist, animate, retry_time):
-                return True
 
-        # if no match works, restore previous word
-        crossword.put_word(previous_word, slot)
-        return False
+# number of set bits in a nonnegative int, int.bit_count is only available from python 3.10
+popcount = getattr(int, 'bit_count', lambda bits: bin(bits).count('1'))
 
 
-class MinlookBackjumpFiller(Filler):
+class PatternCache:
     """
-    Fills the crossword using a dfs algorithm with minlook heuristic:
-    - keeps selecting unfilled slot with fewest possible matches
-    - considers k random matching word, chooses word with the most possible crossing words (product of # in each slot)
-    - backtracks if there is a slot with no matches
-
-    Each iteration returns (is_filled, failed_slot)
+    Bounded cache of pattern lookups with least-recently-used eviction.
+    Keys are (pattern, regex, min score) tuples, so entries affected by a word can be invalidated.
     """
 
-    def __init__(self, k):
-        self.k = k
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        """maximum number of entries, or None for no limit"""
 
-    def fill(self, crossword, wordlist, animate, retry_time=None):
-        if retry_time and time.time() > retry_time:
-            raise RetryException()
+        self.entries = OrderedDict()
+        """key => value, from least to most recently used"""
 
+        self.lengths = defaultdict(set)
+        """pattern length => keys with patterns of that length"""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Returns cached value for key, or None if it isn't cached"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Caches value for key, evicting least recently used entries if full"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            self.lengths[len(key[0])].add(key)
+        self.entries[key] = value
+
+        if self.max_size is not None:
+            while len(self.entries) > self.max_size:
+                evicted_key, _ = self.entries.popitem(last=False)
+                self.lengths[len(evicted_key[0])].discard(evicted_key)
+                self.evictions += 1
+
+    def invalidate(self, word):
+        """Drops every entry whose pattern matches word, since adding or removing word changes it"""
+        keys = self.lengths[len(word)]
+        stale_keys = [key for key in keys if PatternCache.is_match(key[0], word)]
+        for key in stale_keys:
+            keys.remove(key)
+            del self.entries[key]
+        self.invalidations += len(stale_keys)
+
+    def clear(self):
+        self.entries.clear()
+        self.lengths.clear()
+
+    def stats(self):
+        """Returns dictionary of cache counters"""
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    @staticmethod
+    def is_match(pattern, word):
+        """Returns whether word matches the wildcard pattern"""
+        return all(
+            letter == EMPTY or letter == word_letter
+            for letter, word_letter in zip(pattern, word)
+        )
+
+
+class Constraint:
+    """
+    Regex constraint on words of a given length, compiled once.
+    Fixed letters, letter classes, prefixes and suffixes are parsed into a letter class per index,
+    which indexes can intersect, and the regex only has to be run on the words those leave.
+    """
+
+    def __init__(self, regex, length):
+        self.regex = regex
+        self.length = length
+
+        self.compiled = re.compile(regex)
+        """compiled regex, used for whatever the letter classes can't express"""
+
+        self.letter_classes, self.exact = Constraint.parse(regex, length)
+        """
+        letter_classes is a list of (negated, letters) or None for any letter, one per index,
+        or None if no word of the length can match. exact is whether they capture the whole regex.
+        """
+
+    def is_match(self, word):
+        """Returns whether word satisfies the constraint"""
+        return self.compiled.search(word) is not None
+
+    @staticmethod
+    def parse(regex, length):
+        """Returns (letter classes, exact) for the regex on words of the given length"""
+        unparsed = [None] * length, False
+
+        body = regex
+        start = body.startswith('^')
+        if start:
+            body = body[1:]
+        end = body.endswith('$')
+        if end:
+            body = body[:-1]
+
+        letter_classes = []
+        i = 0
+        while i < len(body):
+            char = body[i]
+            if char == '.':
+                letter_classes.append(None)
+            elif 'A' <= char <= 'Z':
+                letter_classes.append((False, frozenset(char)))
+            elif char == '[':
+                close = body.find(']', i)
+                letter_class = Constraint.parse_class(body[i + 1 : close]) if close != -1 else None
+                if letter_class is None:
+                    return unparsed
+                letter_classes.append(letter_class)
+                i = close
+            elif char in '*+' and i == len(body) - 1 and len(letter_classes) == 1 and start and end:
+                # a single letter class repeated across the whole word
+                return letter_classes * length, True
+            else:
+                return unparsed
+            i += 1
+
+        if start and end:
+            return (letter_classes, True) if len(letter_classes) == length else (None, True)
+        if len(letter_classes) > length:
+            return None, True
+        if start:
+            return letter_classes + [None] * (length - len(letter_classes)), True
+        if end:
+            return [None] * (length - len(letter_classes)) + letter_classes, True
+
+        # could match anywhere in the word, so no index is fixed
+        return unparsed
+
+    @staticmethod
+    def parse_class(body):
+        """Returns (negated, letters) for the body of a bracketed letter class, or None if it isn't just letters"""
+        negated = body.startswith('^')
+        if negated:
+            body = body[1:]
+
+        letters = set()
+        i = 0
+        while i < len(body):
+            if i + 2 < len(body) and body[i + 1] == '-':
+                first, last = body[i], body[i + 2]
+                if not ('A' <= first <= last <= 'Z'):
+                    return None
+                letters.update(chr(c) for c in range(ord(first), ord(last) + 1))
+                i += 3
+            elif 'A' <= body[i] <= 'Z':
+                letters.add(body[i])
+                i += 1
+            else:
+                return None
+
+        if not letters:
+            return None
+        return negated, frozenset(letters)
+
+
+class Wordlist:
+    """Collection of words to be used for filling a crossword"""
+
+    def __init__(self, words, index='set', cache_size=None):
+        # index is either a name from INDEXES or a prebuilt index, like a CompiledIndex
+        self.words = set(words) if isinstance(index, str) else words
+        self.added_words = set()
+
+        # mapping from word to score, words without one score 0
+        # compiled wordlists keep scores in their index, and only read them into a dictionary when first needed
+        if not isinstance(index, str):
+            self.scores = None
+        elif isinstance(words, dict):
+            self.scores = words
+        else:
+            self.scores = dict.fromkeys(self.words, 0)
+
+        # sorted distinct scores of the words, or None if they need to be recomputed, see score_level
+        self.score_levels = None
+
+        # mapping from score level to length to bitset of ids in the bitset index of words scoring at least that,
+        # from least to most recently used, see get_score_mask
+        self.score_masks = OrderedDict()
+
+        # mapping from wildcard patterns to lists of matching words, used for memoization
+        self.pattern_matches = PatternCache(cache_size)
+
+        # mapping from wildcard patterns to number of matching words, used for memoization
+        self.pattern_counts = PatternCache(cache_size)
+
+        # mapping from wildcard patterns to letter counts of matching words at each index, used for memoization
+        self.count_tables = PatternCache(cache_size)
+
+        # pattern index used to look up matches, see INDEXES
+        self.index = INDEXES[index](self.words) if isinstance(index, str) else index
+
+        # bitset index built on demand for fillers that work with word ids, if index isn't one
+        self.bitset_index = None
+
+        # mapping from (regex, length) to compiled Constraint
+        self.constraints = {}
+
+        # mapping from (regex, length) to set of words of that length satisfying the regex
+        self.constraint_matches = {}
+
+        # whether words can no longer be added or removed, since sessions share the wordlist as their base
+        self.frozen = False
+
+        # mapping from minimum score to ThresholdWordlist view, see at_least
+        self.thresholds = {}
+
+    def session(self, cache_size=None):
+        """Returns a new WordlistSession with this wordlist as its base, freezing this wordlist"""
+        self.frozen = True
+        return WordlistSession(self, cache_size)
+
+    def at_least(self, min_score):
+        """Returns ThresholdWordlist view of the words scoring at least min_score, made the first time it's needed"""
+        level = self.score_level(min_score)
+        view = self.thresholds.get(level)
+        if view is None:
+            view = self.thresholds[level] = ThresholdWordlist(self, level)
+        return view
+
+    def count_at_least(self, min_score):
+        """Returns number of words scoring at least min_score"""
+        if self.scores is None:
+            return self.index.count_at_least(min_score)
+        return sum(score >= min_score for score in self.scores.values())
+
+    def add_word(self, word, score=0):
+        if self.frozen:
+            raise TypeError('Wordlist is frozen, edit a session of it instead')
+        if word not in self.words:
+            self.index.add(word)
+            if self.bitset_index:
+                self.bitset_index.add(word)
+            self.get_scores()[word] = score
+            self.score_levels = None
+            if self.score_masks:
+                bit = 1 << self.get_bitset_index().find(word)
+                for level, masks in self.score_masks.items():
+                    if score >= level and len(word) in masks:
+                        masks[len(word)] |= bit
+            self.words.add(word)
+            self.added_words.add(word)
+            self.__invalidate(word)
+
+    def remove_word(self, word):
+        if self.frozen:
+            raise TypeError('Wordlist is frozen, edit a session of it instead')
+        if word in self.words:
+            if self.score_masks:
+                bit = 1 << self.get_bitset_index().find(word)
+                for masks in self.score_masks.values():
+                    if len(word) in masks:
+                        masks[len(word)] &= ~bit
+            self.index.remove(word)
+            if self.bitset_index:
+                self.bitset_index.remove(word)
+            self.get_scores().pop(word)
+            self.score_levels = None
+            self.words.remove(word)
+            self.__invalidate(word)
+        if word in self.added_words:
+            self.added_words.remove(word)
+
+    def __invalidate(self, word):
+        self.pattern_matches.invalidate(word)
+        self.pattern_counts.invalidate(word)
+        for view in self.thresholds.values():
+            view.invalidate()
+        self.count_tables.invalidate(word)
+
+        # constraint matches are kept up to date instead, since they're expensive to rebuild
+        for (regex, length), matches in self.constraint_matches.items():
+            if length == len(word):
+                if word in self.words and self.get_constraint(regex, length).is_match(word):
+                    matches.add(word)
+                else:
+                    matches.discard(word)
+
+    def get_constraint(self, regex, length):
+        """Returns the regex compiled as a Constraint on words of the given length"""
+        constraint = self.constraints.get((regex, length))
+        if constraint is None:
+            constraint = self.constraints[(regex, length)] = Constraint(regex, length)
+        return constraint
+
+    def get_constraint_matches(self, regex, length):
+        """Returns set of words of the given length that satisfy the regex"""
+        matches = self.constraint_matches.get((regex, length))
+        if matches is not None:
+            return matches
+
+        # narrow down with the index first, so the regex only runs on what the letter classes leave
+        constraint = self.get_constraint(regex, length)
+        matches = self.index.class_matches(length, constraint.letter_classes)
+        if not constraint.exact:
+            matches = {match for match in matches if constraint.is_match(match)}
+
+        self.constraint_matches[(regex, length)] = matches
+
+        return matches
+
+    def get_scores(self):
+        """Returns dictionary mapping each word to its score"""
+        if self.scores is None:
+            self.scores = {word: self.index.score(word) for word in self.words}
+        return self.scores
+
+    def score(self, word):
+        """Returns score of the word, or None if it isn't in the wordlist"""
+        if self.scores is None:
+            return self.index.score(word)
+        return self.scores.get(word)
+
+    def sort_by_score(self, words):
+        """Sorts the list of words from highest to lowest score in place, keeping the order of words with the same score"""
+        # compiled wordlists look up each word's score in the file, rather than reading every score on the first sort
+        key = self.index.score if self.scores is None else self.scores.__getitem__
+        words.sort(key=key, reverse=True)
+
+    def get_score_levels(self):
+        """Returns sorted list of the distinct scores of the words"""
+        if self.score_levels is None:
+            if self.scores is None:
+                self.score_levels = self.index.score_levels()
+            else:
+                self.score_levels = sorted(set(self.scores.values()))
+        return self.score_levels
+
+    def score_level(self, min_score):
+        """
+        Returns the lowest score of any word that is at least min_score, or one more than the highest score if none is,
+        so every threshold between two scores shares the same masks, views and cached lookups
+        """
+        levels = self.get_score_levels()
+        i = bisect_left(levels, min_score)
+        if i < len(levels):
+            return levels[i]
+        return levels[-1] + 1 if levels else min_score
+
+    def get_score_mask(self, length, level):
+        """Returns bitset of ids in the bitset index of words of the given length scoring at least the score level"""
+        masks = self.score_masks.get(level)
+        if masks is None:
+            masks = self.score_masks[level] = {}
+            while len(self.score_masks) > SCORE_MASK_CACHE_SIZE:
+                self.score_masks.popitem(last=False)
+        else:
+            self.score_masks.move_to_end(level)
+
+        bits = masks.get(length)
+        if bits is None:
+            bits = masks[length] = self.get_bitset_index().score_mask(length, level, self.score)
+        return bits
+
+    def __score_threshold(self, min_score):
+        """Returns score level of min_score, or None if every word scores at least that and the main index can be used"""
+        level = self.score_level(min_score)
+        levels = self.get_score_levels()
+        if not levels or level <= levels[0]:
+            return None
+        return level
+
+    def __threshold_mask(self, pattern, level):
+        """Returns bitset of ids of words matching the pattern that score at least the score level, for bitset indexes"""
+        return self.index.mask(pattern) & self.get_score_mask(len(pattern), level)
+
+    def get_matches(self, pattern, regex='', min_score=None):
+        """Returns set of words matching the pattern and satisfying the regex, scoring at least min_score if given"""
+        if min_score is not None:
+            min_score = self.__score_threshold(min_score)
+
+        matches = self.pattern_matches.get((pattern, regex, min_score))
+        if matches is not None:
+            return matches
+
+        if min_score is None:
+            matches = self.index.matches(pattern)
+        elif isinstance(self.index, BitsetIndex):
+            matches = self.index.decode(len(pattern), self.__threshold_mask(pattern, min_score))
+        else:
+            # other indexes have no ids to mask, so filter the pattern's cached matches instead of indexing again
+            score = self.score
+            matches = {match for match in self.get_matches(pattern) if score(match) >= min_score}
+
+        if regex:
+            matches = matches & self.get_constraint_matches(regex, len(pattern))
+
+        self.pattern_matches.put((pattern, regex, min_score), matches)
+
+        return matches
+
+    def count_matches(self, pattern, regex='', min_score=None):
+        """Returns number of matches for the pattern, without building the match set if possible"""
+        if min_score is not None:
+            min_score = self.__score_threshold(min_score)
+
+        if regex or (pattern, regex, min_score) in self.pattern_matches:
+            return len(self.get_matches(pattern, regex, min_score))
+
+        count = self.pattern_counts.get((pattern, regex, min_score))
+        if count is not None:
+            return count
+
+        if min_score is None:
+            count = self.index.count(pattern)
+        elif isinstance(self.index, BitsetIndex):
+            count = popcount(self.__threshold_mask(pattern, min_score))
+        else:
+            return len(self.get_matches(pattern, regex, min_score))
+        self.pattern_counts.put((pattern, regex, min_score), count)
+
+        return count
+
+    def get_count_table(self, pattern, regex='', min_score=None):
+        """
+        Returns, for each index of the pattern, mapping from letter to number of matches with that letter there.
+        The count for letter L at index i is the number of matches the pattern would have with L filled in at i.
+        """
+        if min_score is not None:
+            min_score = self.__score_threshold(min_score)
+
+        table = self.count_tables.get((pattern, regex, min_score))
+        if table is not None:
+            return table
+
+        if min_score is None and not regex:
+            table = self.index.count_table(pattern)
+        elif isinstance(self.index, BitsetIndex) and not regex:
+            table = self.index.count_table(pattern, self.__threshold_mask(pattern, min_score))
+        else:
+            matches = self.get_matches(pattern, regex, min_score)
+            table = [Counter(map(itemgetter(i), matches)) for i in range(len(pattern))]
+
+        self.count_tables.put((pattern, regex, min_score), table)
+
+        return table
+
+    def get_bitset_index(self):
+        """Returns a BitsetIndex of the words, which is the wordlist's own index if it already is one"""
+        if isinstance(self.index, BitsetIndex):
+            return self.index
+        if self.bitset_index is None:
+            self.bitset_index = BitsetIndex(self.words)
+        return self.bitset_index
+
+    def cache_stats(self):
+        """Returns counters of the match and count caches"""
+        return {
+            'matches': self.pattern_matches.stats(),
+            'counts': self.pattern_counts.stats(),
+            'tables': self.count_tables.stats(),
+        }
+
+
+class WordlistSession:
+    """
+    Editable view of a frozen Wordlist, its base, that keeps its own added and removed words.
+    Patterns of lengths the session hasn't edited are looked up in the base and its caches,
+    and only patterns of edited lengths merge the base's matches with the edits, so many sessions
+    can share one base in memory while each sees only its own edits.
+    """
+
+    def __init__(self, base, cache_size=None):
+        self.base = base
+
+        # mapping from added word to its score
+        self.added = {}
+
+        # set of words of the base removed in this session
+        self.removed = set()
+
+        # lengths of the added and removed words
+        self.edited_lengths = set()
+
+        # read-only set of the words in the session
+        self.words = SessionWords(self)
+
+        # mapping from wildcard patterns of edited lengths to matching words, used for memoization
+        self.pattern_matches = PatternCache(cache_size)
+
+        # mapping from wildcard patterns of edited lengths to letter counts of matching words, used for memoization
+        self.count_tables = PatternCache(cache_size)
+
+        # bitset index of the session's words, built on demand if the session has edits
+        self.bitset_index = None
+
+        # mapping from minimum score to ThresholdWordlist view, see at_least
+        self.thresholds = {}
+
+    def at_least(self, min_score):
+        """Returns ThresholdWordlist view of the session's words scoring at least min_score"""
+        level = self.score_level(min_score)
+        view = self.thresholds.get(level)
+        if view is None:
+            view = self.thresholds[level] = ThresholdWordlist(self, level)
+        return view
+
+    def score_level(self, min_score):
+        """Returns the lowest score of any word of the base or added in the session that is at least min_score, see Wordlist.score_level"""
+        level = self.base.score_level(min_score)
+        for score in self.added.values():
+            if min_score <= score < level:
+                level = score
+        return level
+
+    def get_score_mask(self, length, level):
+        """Returns bitset of ids in the session's bitset index of words of the given length scoring at least the score level"""
+        bits = self.base.get_score_mask(length, level)
+        if length in self.edited_lengths:
+            index = self.get_bitset_index()
+            for word, score in self.added.items():
+                if len(word) == length and score >= level:
+                    bits |= 1 << index.find(word)
+        return bits
+
+    def count_at_least(self, min_score):
+        """Returns number of the session's words scoring at least min_score"""
+        removed = sum(self.base.score(word) >= min_score for word in self.removed)
+        added = sum(score >= min_score for score in self.added.values())
+        return self.base.count_at_least(min_score) - removed + added
+
+    def add_word(self, word, score=0):
+        if word in self.words:
+            return
+        if word in self.removed:
+            self.removed.remove(word)
+        else:
+            self.added[word] = score
+        if self.bitset_index:
+            self.bitset_index.add(word)
+        self.__edit(word)
+
+    def remove_word(self, word):
+        if word not in self.words:
+            return
+        if word in self.added:
+            del self.added[word]
+        else:
+            self.removed.add(word)
+        if self.bitset_index:
+            self.bitset_index.remove(word)
+        self.__edit(word)
+
+    def __edit(self, word):
+        self.edited_lengths = {len(edited_word) for edited_word in chain(self.added, self.removed)}
+        self.pattern_matches.invalidate(word)
+        self.count_tables.invalidate(word)
+        for view in self.thresholds.values():
+            view.invalidate()
+
+    def get_constraint(self, regex, length):
+        """Returns the regex compiled as a Constraint on words of the given length"""
+        return self.base.get_constraint(regex, length)
+
+    def get_matches(self, pattern, regex='', min_score=None):
+        """Returns set of words matching the pattern and satisfying the regex, scoring at least min_score if given"""
+        length = len(pattern)
+        if length not in self.edited_lengths:
+            return self.base.get_matches(pattern, regex, min_score)
+        if min_score is not None:
+            min_score = self.score_level(min_score)
+
+        matches = self.pattern_matches.get((pattern, regex, min_score))
+        if matches is not None:
+            return matches
+
+        matches = self.base.get_matches(pattern, regex, min_score) - self.removed
+        constraint = self.base.get_constraint(regex, length) if regex else None
+        for word, score in self.added.items():
+            if (
+                len(word) == length
+                and PatternCache.is_match(pattern, word)
+                and (constraint is None or constraint.is_match(word))
+                and (min_score is None or score >= min_score)
+            ):
+                matches.add(word)
+
+        self.pattern_matches.put((pattern, regex, min_score), matches)
+
+        return matches
+
+    def count_matches(self, pattern, regex='', min_score=None):
+        """Returns number of matches for the pattern"""
+        if len(pattern) not in self.edited_lengths:
+            return self.base.count_matches(pattern, regex, min_score)
+        return len(self.get_matches(pattern, regex, min_score))
+
+    def get_count_table(self, pattern, regex='', min_score=None):
+        """Returns, for each index of the pattern, mapping from letter to number of matches with that letter there"""
+        if len(pattern) not in self.edited_lengths:
+            return self.base.get_count_table(pattern, regex, min_score)
+        if min_score is not None:
+            min_score = self.score_level(min_score)
+
+        table = self.count_tables.get((pattern, regex, min_score))
+        if table is not None:
+            return table
+
+        matches = self.get_matches(pattern, regex, min_score)
+        table = [Counter(map(itemgetter(i), matches)) for i in range(len(pattern))]
+        self.count_tables.put((pattern, regex, min_score), table)
+
+        return table
+
+    def score(self, word):
+        """Returns score of the word, or None if it isn't in the session"""
+        if word in self.added:
+            return self.added[word]
+        if word in self.removed:
+            return None
+        return self.base.score(word)
+
+    def sort_by_score(self, words):
+        """Sorts the list of words from highest to lowest score in place, keeping the order of words with the same score"""
+        if not self.added:
+            self.base.sort_by_score(words)
+            return
+        score = self.base.score
+        added = self.added
+        words.sort(key=lambda word: added[word] if word in added else score(word), reverse=True)
+
+    def get_bitset_index(self):
+        """Returns a bitset index of the words, the base's own until the session has edits, then a SessionBitsetIndex over it"""
+        if self.bitset_index is not None:
+            return self.bitset_index
+        if not self.added and not self.removed:
+            return self.base.get_bitset_index()
+        self.bitset_index = SessionBitsetIndex(self.base.get_bitset_index())
+        for word in self.removed:
+            self.bitset_index.remove(word)
+        for word in self.added:
+            self.bitset_index.add(word)
+        return self.bitset_index
+
+    def cache_stats(self):
+        """Returns counters of the base's caches, including the session's own lookups of edited lengths"""
+        stats = self.base.cache_stats()
+        for name, cache in [('matches', self.pattern_matches), ('tables', self.count_tables)]:
+            stats[name] = {key: value + stats[name][key] for key, value in cache.stats().items()}
+        return stats
+
+
+class SessionWords:
+    """Read-only set of the words in a WordlistSession"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def __contains__(self, word):
+        session = self.session
+        return word in session.added or (word in session.base.words and word not in session.removed)
+
+    def __len__(self):
+        session = self.session
+        return len(session.base.words) - len(session.removed) + len(session.added)
+
+    def __iter__(self):
+        session = self.session
+        for word in session.base.words:
+            if word not in session.removed:
+                yield word
+        yield from session.added
+
+
+class ThresholdWordlist:
+    """
+    View of a wordlist, or a session of one, with only the words scoring at least min_score.
+    Fillers search it like any wordlist, and it answers from the wordlist's own min_score queries and caches,
+    so one loaded wordlist can fill grids at different quality thresholds.
+    """
+
+    def __init__(self, wordlist, min_score):
+        self.wordlist = wordlist
+        self.min_score = min_score
+
+        # read-only set of the words scoring at least min_score
+        self.words = ThresholdWords(self)
+
+        # bitset index of the words scoring at least min_score, made on demand
+        self.bitset_index = None
+
+    def __min_score(self, min_score):
+        return self.min_score if min_score is None else max(min_score, self.min_score)
+
+    def invalidate(self):
+        """Forgets the number and bitset index of the words, after the wordlist was edited"""
+        self.words.length = None
+        self.bitset_index = None
+
+    def get_matches(self, pattern, regex='', min_score=None):
+        """Returns set of words matching the pattern and satisfying the regex, scoring at least the view's min_score"""
+        return self.wordlist.get_matches(pattern, regex, self.__min_score(min_score))
+
+    def count_matches(self, pattern, regex='', min_score=None):
+        """Returns number of matches for the pattern"""
+        return self.wordlist.count_matches(pattern, regex, self.__min_score(min_score))
+
+    def get_count_table(self, pattern, regex='', min_score=None):
+        """Returns, for each index of the pattern, mapping from letter to number of matches with that letter there"""
+        return self.wordlist.get_count_table(pattern, regex, self.__min_score(min_score))
+
+    def get_constraint(self, regex, length):
+        return self.wordlist.get_constraint(regex, length)
+
+    def score(self, word):
+        """Returns score of the word, or None if it isn't in the view"""
+        score = self.wordlist.score(word)
+        if score is None or score < self.min_score:
+            return None
+        return score
+
+    def sort_by_score(self, words):
+        self.wordlist.sort_by_score(words)
+
+    def get_bitset_index(self):
+        """Returns a ThresholdBitsetIndex of the words scoring at least min_score, made the first time it's needed"""
+        if self.bitset_index is None:
+            self.bitset_index = ThresholdBitsetIndex(self.wordlist, self.min_score)
+        return self.bitset_index
+
+    def cache_stats(self):
+        return self.wordlist.cache_stats()
+
+
+class ThresholdWords:
+    """Read-only set of the words in a ThresholdWordlist"""
+
+    def __init__(self, view):
+        self.view = view
+        self.length = None
+
+    def __contains__(self, word):
+        view = self.view
+        return word in view.wordlist.words and view.wordlist.score(word) >= view.min_score
+
+    def __len__(self):
+        if self.length is None:
+            self.length = self.view.wordlist.count_at_least(self.view.min_score)
+        return self.length
+
+    def __iter__(self):
+        view = self.view
+        score = view.wordlist.score
+        return (word for word in view.wordlist.words if score(word) >= view.min_score)
+
+
+class ThresholdBitsetIndex(BitsetIndex):
+    """
+    Bitset index of a ThresholdWordlist, the bitset index of its wordlist with every mask ANDed with
+    the wordlist's score mask, so views at any threshold share their wordlist's bitsets instead of copying them.
+    """
+
+    def __init__(self, wordlist, min_score):
+        self.wordlist = wordlist
+        self.min_score = min_score
+
+        # the wordlist's bitset index
+        self.base = wordlist.get_bitset_index()
+
+        # mapping from length to bitset of ids of words of that length scoring at least min_score
+        self.score_masks = {}
+
+    def add(self, word):
+        raise TypeError('Threshold views are read-only')
+
+    def remove(self, word):
+        raise TypeError('Threshold views are read-only')
+
+    def threshold_mask(self, length):
+        """Returns bitset of ids of words of the given length scoring at least the view's min_score"""
+        bits = self.score_masks.get(length)
+        if bits is None:
+            bits = self.score_masks[length] = self.wordlist.get_score_mask(length, self.min_score)
+        return bits
+
+    def bitset(self, length, i, letter):
+        """Returns bitset of ids of words of the given length with letter at index i, including words below the threshold"""
+        return self.base.bitset(length, i, letter)
+
+    def letters(self, length, i):
+        """Returns letters that may have a nonempty bitset at index i of words of the given length"""
+        return self.base.letters(length, i)
+
+    def word(self, length, word_id):
+        """Returns word of the given length with the given id"""
+        return self.base.word(length, word_id)
+
+    def find(self, word):
+        """Returns id of the word, or None if it isn't in the index or scores below the threshold"""
+        word_id = self.base.find(word)
+        if word_id is None or not self.threshold_mask(len(word)) >> word_id & 1:
+            return None
+        return word_id
+
+    def mask(self, pattern):
+        """Returns bitset of ids of words matching the pattern"""
+        return self.base.mask(pattern) & self.threshold_mask(len(pattern))
+
+    def decode(self, length, bits):
+        """Returns set of words of the given length whose ids are in the bitset"""
+        return self.base.decode(length, bits)
+
+
+class RetryException(Exception):
+    """Exceeded retry time"""
+
+
+class SlotTracker:
+    """
+    Keeps the number of matches of every unfilled slot in a crossword, recounting only the slots
+    that contain changed squares, and keeps the counts in a heap so the slot with the fewest
+    matches can be found in O(log n) instead of by counting every slot.
+    """
+
+    def __init__(self, crossword, wordlist):
+        self.crossword = crossword
+        self.wordlist = wordlist
+
+        self.order = {slot: i for i, slot in enumerate(crossword.words)}
+        """slot => position in crossword.words, breaks ties the same way as Filler.fewest_matches"""
+
+        self.counts = {}
+        """unfilled slot => number of matches"""
+
+        self.heap = []
+        """heap of (count, order, slot), entries whose count is out of date are skipped lazily"""
+
+        for slot in crossword.words:
+            self.update(slot)
+
+    def update(self, slot):
+        """Recounts matches of the slot"""
+        crossword = self.crossword
+        slot_id = crossword.slot_ids[slot]
+        if not crossword.slot_empties[slot_id]:
+            self.counts.pop(slot, None)
+            return
+
+        count = self.wordlist.count_matches(
+            crossword.slot_word(slot_id), crossword.slot_constraints[slot_id]
+        )
+        if self.counts.get(slot) != count:
+            self.counts[slot] = count
+            heappush(self.heap, (count, self.order[slot], slot))
+
+    def touch(self, squares):
+        """Recounts matches of every slot that contains one of the changed squares"""
+        crossword = self.crossword
+        slot_ids = {
+            slot_id
+            for square in squares
+            for slot_id, _ in crossword.square_slots[crossword.square_ids[square]]
+        }
+        for slot_id in slot_ids:
+            self.update(crossword.slot_list[slot_id])
+
+    def fewest_matches(self):
+        """Returns unfilled slot with the fewest matches and its number of matches"""
+        heap = self.heap
+
+        # rebuild the heap once it's mostly out of date entries
+        if len(heap) > 4 * len(self.counts) + 64:
+            heap[:] = [(count, self.order[slot], slot) for slot, count in self.counts.items()]
+            heapify(heap)
+
+        while heap:
+            count, _, slot = heap[0]
+            if self.counts.get(slot) == count:
+                return slot, count
+            heappop(heap)
+
+        return None, len(self.wordlist.words) + 1
+
+
+class NogoodStore:
+    """
+    Bounded store of nogoods, sets of (slot, word) assignments proven to have no solution for a grid.
+    Shared between searches of the same grid, so later attempts skip regions already proven infeasible.
+    """
+
+    def __init__(self, max_size=NOGOOD_LIMIT):
+        self.max_size = max_size
+        """maximum number of nogoods, the oldest are dropped first"""
+
+        self.nogoods = OrderedDict()
+        """nogood => None, from oldest to newest"""
+
+        self.watches = defaultdict(set)
+        """(slot, word) => nogoods that contain it"""
+
+        self.unsatisfiable = False
+        """whether the empty nogood was found, i.e. the grid has no solution at all"""
+
+    def __len__(self):
+        return len(self.nogoods)
+
+    def add(self, assignments):
+        """Records that no solution has all of the given (slot, word) assignments"""
+        nogood = frozenset(assignments)
+        if not nogood:
+            self.unsatisfiable = True
+            return
+        if nogood in self.nogoods:
+            return
+
+        self.nogoods[nogood] = None
+        for assignment in nogood:
+            self.watches[assignment].add(nogood)
+
+        while len(self.nogoods) > self.max_size:
+            oldest, _ = self.nogoods.popitem(last=False)
+            for assignment in oldest:
+                self.watches[assignment].discard(oldest)
+
+    def violation(self, crossword, slot, word):
+        """Returns a nogood that placing word in slot would complete, or None if there is none"""
+        for nogood in self.watches.get((slot, word), ()):
+            if all(
+                crossword.words[other_slot] == other_word
+                for other_slot, other_word in nogood
+                if other_slot != slot
+            ):
+                return nogood
+        return None
+
+
+# reasons a match is rejected, see Filler.rejection_reason
+INVALID_WORD = 'invalid word'
+DUPE = 'dupe'
+INVALID_CROSSING = 'invalid crossing'
+CROSSING_DUPE = 'crossing dupe'
+NOGOOD = 'nogood'
+FILLER_REJECTED = 'rejected by filler'
+
+SEARCH_PHASES = ('select', 'order', 'place')
+
+
+class SearchStats:
+    """
+    Counters and timings of a Search, collected only when one is passed to it, so searches without one pay
+    for little more than a check per step. Time spent in the filler is split into phases:
+    choosing slots (select), producing their matches (order) and placing them (place).
+    """
+
+    def __init__(self):
+        self.status = None
+        """status of the search when last finished"""
+
+        self.nodes = 0
+        self.backtracks = 0
+
+        self.backjumps = []
+        """number of levels skipped by each backtrack that skipped any"""
+
+        self.candidates = 0
+        """number of matches tried"""
+
+        self.rejections = Counter()
+        """rejection reason => number of matches rejected for it"""
+
+        self.get_matches_calls = 0
+        self.get_matches_hits = 0
+
+        self.seconds = dict.fromkeys(SEARCH_PHASES, 0.0)
+        """phase => seconds spent in it"""
+
+        self.total_seconds = 0.0
+
+        self.start_time = None
+        self.start_cache = None
+
+    def start(self, search):
+        """Called when the search starts, snapshots the wordlist's cache counters to count its own lookups"""
+        self.start_time = time.perf_counter()
+        cache = search.wordlist.cache_stats()['matches']
+        self.start_cache = (cache['hits'], cache['misses'])
+
+    def finish(self, search):
+        """Copies the search's own counters in, can be called again after the search resumes"""
+        self.status = search.status
+        self.nodes = search.nodes
+        self.backtracks = search.backtracks
+        self.backjumps = list(search.backjumps)
+        if search.pruned:
+            self.rejections[NOGOOD] = search.pruned
+
+        cache = search.wordlist.cache_stats()['matches']
+        start_hits, start_misses = self.start_cache
+        self.get_matches_hits = cache['hits'] - start_hits
+        self.get_matches_calls = self.get_matches_hits + cache['misses'] - start_misses
+
+        self.total_seconds = time.perf_counter() - self.start_time
+
+    def time(self, phase, function, *args):
+        """Returns function(*args), adding the time it took to the phase"""
+        tic = time.perf_counter()
+        result = function(*args)
+        self.seconds[phase] += time.perf_counter() - tic
+        return result
+
+    def time_matches(self, matches):
+        """Yields from matches, adding the time taken to produce each one to the order phase"""
+        matches = iter(matches)
+        while True:
+            tic = time.perf_counter()
+            match = next(matches, None)
+            self.seconds['order'] += time.perf_counter() - tic
+            if match is None:
+                return
+            yield match
+
+    def reject(self, search, slot, match):
+        """Counts the reason match was rejected from the slot, called once the search has rolled the placement back"""
+        reason = Filler.rejection_reason(search.crossword, search.wordlist, slot, match)
+        self.rejections[reason or FILLER_REJECTED] += 1
+
+    def __str__(self):
+        lines = [
+            f'Nodes: {self.nodes} ({self.nodes / self.total_seconds:.0f} per second)' if self.total_seconds else f'Nodes: {self.nodes}',
+            f'Candidates tried: {self.candidates}',
+            f'Backtracks: {self.backtracks}',
+        ]
+        if self.backjumps:
+            lines.append(
+                f'Backjumps: {len(self.backjumps)}, skipping {sum(self.backjumps)} levels, at most {max(self.backjumps)}'
+            )
+        lines.append(f'Rejections: {sum(self.rejections.values())}')
+        for reason, count in self.rejections.most_common():
+            lines.append(f'  {reason}: {count}')
+        lines.append(f'get_matches calls: {self.get_matches_calls} ({self.get_matches_hits} cache hits)')
+        lines.append(f'Time: {self.total_seconds:.4f} seconds')
+        for phase in SEARCH_PHASES:
+            lines.append(f'  {phase}: {self.seconds[phase]:.4f} seconds')
+        return '\n'.join(lines)
+
+
+class SearchObserver:
+    """
+    Receives events of a Search it's attached to. Every method does nothing by default, so observers
+    only override the events they need. Searches without observers skip the calls entirely.
+    """
+
+    def on_start(self, search):
+        """Called once the search is set up, before its first node"""
+
+    def on_node(self, search):
+        """Called when the search expands a node"""
+
+    def on_place(self, search, slot, word):
+        """Called when the search places the word in the slot"""
+
+    def on_backtrack(self, search, failed_slot, resume_depth):
+        """Called when failed_slot fails and the search backtracks to the frame at resume_depth, -1 if there is none"""
+
+    def on_solution(self, search):
+        """Called when the crossword is filled"""
+
+    def on_exhausted(self, search):
+        """Called when the search runs out of matches"""
+
+
+class AnimationRenderer(SearchObserver):
+    """Draws the crossword in the terminal as it's filled, at most fps times per second plus once at the end"""
+
+    def __init__(self, fps=ANIMATION_FPS, out=None):
+        self.interval = 1 / fps
+        self.out = out or sys.stdout
+        self.last_render = 0
+
+    def render(self, search):
+        self.last_render = time.perf_counter()
+        self.out.write(utils.CLEAR_TERMINAL + str(search.crossword) + '\n')
+        self.out.flush()
+
+    def on_node(self, search):
+        if time.perf_counter() - self.last_render >= self.interval:
+            self.render(search)
+
+    def on_solution(self, search):
+        self.render(search)
+
+    def on_exhausted(self, search):
+        self.render(search)
+
+
+class TraceWriter(SearchObserver):
+    """Writes every event of the search to a file as a line of JSON, with the node count and depth it happened at"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, search, event, **fields):
+        self.out.write(json.dumps({'event': event, 'node': search.nodes, 'depth': search.depth, **fields}) + '\n')
+
+    def on_start(self, search):
+        self.write(search, 'start', filler=type(search.filler).__name__)
+
+    def on_node(self, search):
+        self.write(search, 'node')
+
+    def on_place(self, search, slot, word):
+        self.write(search, 'place', slot=slot, word=word)
+
+    def on_backtrack(self, search, failed_slot, resume_depth):
+        self.write(search, 'backtrack', slot=failed_slot, resume_depth=resume_depth)
+
+    def on_solution(self, search):
+        self.write(search, 'solution', words=[[slot, word] for slot, word in search.crossword.words.items()])
+
+    def on_exhausted(self, search):
+        self.write(search, 'exhausted', slot=search.failed_slot)
+
+
+class SearchFrame:
+    """Node of a Search, trying matches for one slot"""
+
+    __slots__ = ('slot', 'matches', 'mark', 'state', 'word')
+
+    def __init__(self, slot, matches, mark, state):
+        self.slot = slot
+        """slot being filled"""
+
+        self.matches = matches
+        """iterator over matches left to try"""
+
+        self.mark = mark
+        """crossword trail position to roll back to before trying the next match"""
+
+        self.state = state
+        """filler state to roll back to before trying the next match, see Filler.checkpoint"""
+
+        self.word = None
+        """match currently placed in the slot"""
+
+
+class Search:
+    """
+    Non-recursive depth-first search that fills a crossword using the strategy of a filler.
+    Keeps an explicit stack of frames, one for each slot being filled, and undoes placements by
+    rolling the crossword's trail of changed squares back, so the search can be paused after
+    any step, inspected and resumed.
+    """
+
+    def __init__(
+        self,
+        filler,
+        crossword,
+        wordlist,
+        animate=False,
+        retry_time=None,
+        nogoods=None,
+        stats=None,
+        observers=(),
+        min_score=None,
+    ):
+        self.filler = filler
+        self.crossword = crossword
+
+        self.wordlist = wordlist if min_score is None else wordlist.at_least(min_score)
+        """wordlist to fill with, a view of the words scoring at least min_score if given one"""
+        self.retry_time = retry_time
+
+        self.observers = list(observers)
+        """SearchObservers notified of the search's events"""
         if animate:
-            utils.clear_terminal()
-            print(crossword)
+            self.observers.append(AnimationRenderer())
+
+        self.nogoods = nogoods
+        """NogoodStore to consult and record nogoods in, or None"""
+
+        self.stats = stats
+        """SearchStats to collect counters and timings in, or None"""
+        if stats is not None:
+            stats.start(self)
+
+        self.stack = []
+        """frames of the slots filled so far, from first to latest"""
+
+        self.status = None
+        """None while searching, True once filled, False once every match failed"""
+
+        self.failed_slot = None
+        """slot whose failure ended the search"""
+
+        self.nodes = 0
+        """number of nodes expanded so far"""
+
+        self.backtracks = 0
+        """number of times the search backtracked"""
+
+        self.backjumps = []
+        """number of levels skipped by each backtrack that skipped any"""
+
+        self.pruned = 0
+        """number of matches skipped because they completed a nogood"""
+
+        self.root = crossword.mark()
+        """crossword trail position from before the search"""
+
+        self.tracker = SlotTracker(crossword, self.wordlist) if filler.tracks_slots else None
+        """match counts of unfilled slots, kept up to date as words are placed and undone, or None if the filler doesn't use them"""
+
+        filler.start(self)
+
+        self.root_state = filler.checkpoint(self)
+        """filler state from before the search"""
+
+        for observer in self.observers:
+            observer.on_start(self)
+
+    @property
+    def depth(self):
+        return len(self.stack)
+
+    def assignments(self):
+        """Returns list of (slot, word) placed by the search so far, in order"""
+        return [(frame.slot, frame.word) for frame in self.stack]
+
+    def failed_depth(self, failed_slot):
+        """Returns depth of the node where failed_slot failed, the latest frame if it is that frame's slot"""
+        if self.stack and self.stack[-1].slot == failed_slot:
+            return len(self.stack) - 1
+        return len(self.stack)
+
+    def run(self, max_nodes=None):
+        """Steps until the search finishes, or pauses after max_nodes steps. Returns status"""
+        steps = 0
+        try:
+            while self.status is None and (max_nodes is None or steps < max_nodes):
+                self.step()
+                steps += 1
+        finally:
+            if self.stats is not None:
+                self.stats.finish(self)
+        return self.status
+
+    def resume(self, depth=None):
+        """
+        Continues a filled search so it can find another fill, trying the next match of the frame at depth,
+        the latest by default, and undoing the frames below it. Returns status, None if the search goes on.
+        """
+        if depth is None:
+            depth = len(self.stack) - 1
+        self.status = None
+
+        # a fill isn't a failure, so it's left chronologically rather than by the filler's backjump
+        del self.stack[depth + 1 :]
+        if not self.stack:
+            self.__rollback(self.root, self.root_state)
+            self.__finish(False)
+            return self.status
+
+        self.filler.resume(self, depth)
+        frame = self.stack[-1]
+        if not self.__place_next(frame):
+            self.__backtrack(frame.slot)
+        return self.status
+
+    async def run_async(self, nodes_per_yield=ASYNC_NODES_PER_YIELD, progress=None):
+        """
+        Steps until the search finishes, yielding to the event loop every nodes_per_yield nodes. Returns status.
+        Calls progress(search) each time it yields, awaiting it if it's a coroutine function.
+        Cancelling the task, or a timeout around it, stops the search where it is, paused like after run(max_nodes).
+        """
+        while self.status is None:
+            self.run(nodes_per_yield)
+            if progress is not None:
+                result = progress(self)
+                if inspect.isawaitable(result):
+                    await result
+            await asyncio.sleep(0)
+        return self.status
+
+    def step(self):
+        """Expands one node: chooses a slot and places its next match, backtracking if needed. Returns status"""
+        if self.status is not None:
+            return self.status
+
+        if self.retry_time and time.time() > self.retry_time:
+            raise RetryException()
+
+        self.nodes += 1
+
+        if self.observers:
+            for observer in self.observers:
+                observer.on_node(self)
+
+        # if the grid is filled, succeed
+        if self.crossword.is_filled():
+            self.__finish(True)
+            return self.status
+
+        # if an earlier search proved the grid has no fill, fail
+        if self.nogoods is not None and self.nogoods.unsatisfiable:
+            self.__finish(False)
+            return self.status
+
+        # choose next slot, if it has no matches, fail
+        if self.stats is None:
+            slot, num_matches = self.filler.select_slot(self)
+            matches = iter(self.filler.candidates(self, slot)) if num_matches else None
+        else:
+            slot, num_matches = self.stats.time('select', self.filler.select_slot, self)
+            if num_matches:
+                matches = self.stats.time_matches(self.stats.time('order', self.filler.candidates, self, slot))
+        if num_matches == 0:
+            self.__backtrack(slot)
+            return self.status
+
+        frame = SearchFrame(
+            slot,
+            matches,
+            self.crossword.mark(),
+            self.filler.checkpoint(self),
+        )
+        self.stack.append(frame)
+
+        # the frame stays on the stack while backtracking, so its rejected matches are blamed on their culprits
+        if not self.__place_next(frame):
+            self.__backtrack(slot)
+
+        return self.status
+
+    def __place_next(self, frame):
+        """Undoes the frame's current match and places its next valid one, returns whether there was one"""
+        self.__rollback(frame.mark, frame.state)
+
+        for match in frame.matches:
+            if self.nogoods is not None:
+                nogood = self.nogoods.violation(self.crossword, frame.slot, match)
+                if nogood is not None:
+                    self.pruned += 1
+                    self.filler.reject(self, frame.slot, nogood)
+                    continue
+
+            if self.stats is None:
+                placed = self.filler.place(self, frame.slot, match)
+            else:
+                self.stats.candidates += 1
+                placed = self.stats.time('place', self.filler.place, self, frame.slot, match)
+
+            if placed:
+                frame.word = match
+                if self.tracker is not None:
+                    self.tracker.touch(square for square, _ in self.crossword.trail[frame.mark :])
+                if self.observers:
+                    for observer in self.observers:
+                        observer.on_place(self, frame.slot, match)
+                return True
+
+            # in case the filler changed the crossword before rejecting the match
+            self.__rollback(frame.mark, frame.state)
+
+            if self.stats is not None:
+                self.stats.reject(self, frame.slot, match)
+
+        frame.word = None
+        return False
+
+    def __finish(self, status):
+        """Ends the search with the status"""
+        self.status = status
+        if self.observers:
+            for observer in self.observers:
+                if status:
+                    observer.on_solution(self)
+                else:
+                    observer.on_exhausted(self)
+
+    def __rollback(self, mark, state):
+        """Undoes every placement since mark, and rolls the filler back to state"""
+        squares = self.crossword.undo(mark)
+        if self.tracker is not None:
+            self.tracker.touch(squares)
+        self.filler.rollback(self, state)
+
+    def __backtrack(self, failed_slot):
+        """Resumes the frame the filler backjumps to from the failed slot, failing the search if there is none"""
+        while True:
+            if self.nogoods is not None:
+                nogood = self.filler.nogood(self, failed_slot)
+                if nogood is not None:
+                    self.nogoods.add(nogood)
+
+            # backjumping fillers give up on frames that couldn't have caused the failure
+            resume_depth = self.filler.backjump(self, failed_slot)
+
+            self.backtracks += 1
+            skipped = self.failed_depth(failed_slot) - resume_depth - 1
+            if skipped:
+                self.backjumps.append(skipped)
+
+            if self.observers:
+                for observer in self.observers:
+                    observer.on_backtrack(self, failed_slot, resume_depth)
+
+            # frames above the resumed one are undone when it places its next match
+            del self.stack[resume_depth + 1 :]
+
+            if not self.stack:
+                self.__rollback(self.root, self.root_state)
+                self.failed_slot = failed_slot
+                self.__finish(False)
+                return
+
+            frame = self.stack[-1]
+            if self.__place_next(frame):
+                return
+
+            # frame ran out of matches, so its own slot failed
+            failed_slot = frame.slot
+
+
+class Filler(ABC):
+    """
+    Abstract base class containing useful methods for filling crosswords.
+    Strategies run on a Search, which calls back into the filler to choose slots and matches.
+    """
+
+    tracks_slots = True
+    """whether the filler's searches keep a SlotTracker, which the default select_slot chooses slots with"""
+
+    def __init__(self, seed=None):
+        self.rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        """random.Random that shuffles matches, seeded with seed unless it already is one"""
+
+    def fill(self, crossword, wordlist, animate, retry_time=None, nogoods=None, stats=None, observers=()):
+        """
+        Fills the given crossword using some strategy, collecting counters in stats if given a SearchStats,
+        and notifying the SearchObservers of the search's events
+        """
+        return Search(self, crossword, wordlist, animate, retry_time, nogoods, stats, observers).run()
+
+    async def fill_async(
+        self, crossword, wordlist, nodes_per_yield=ASYNC_NODES_PER_YIELD, progress=None, nogoods=None, stats=None, observers=()
+    ):
+        """
+        Fills the given crossword like fill, but yields to the event loop every nodes_per_yield nodes,
+        calling progress(search) each time, so many fills can share an event loop without a thread each.
+        Returns whether the crossword was filled, see Search.run_async.
+        """
+        search = Search(self, crossword, wordlist, nogoods=nogoods, stats=stats, observers=observers)
+        return await search.run_async(nodes_per_yield, progress)
+
+    def iter_fills(self, crossword, wordlist, max_fills=None, min_distance=1, stats=None, observers=()):
+        """
+        Yields the crossword every time one search fills it at least min_distance squares differently from every
+        earlier fill, until there are max_fills fills or the search is exhausted. The crossword only stays filled
+        until the generator resumes, so copy its words or grid to keep them. After each fill, the search goes on
+        from the deepest frame whose next matches could still fill the crossword far enough from every earlier fill.
+        """
+        search = Search(self, crossword, wordlist, stats=stats, observers=observers)
+        fills = []
+
+        while search.run():
+            letters = bytes(crossword.letters)
+            if all(Filler.hamming_distance(letters, fill) >= min_distance for fill in fills):
+                fills.append(letters)
+                yield crossword
+                if len(fills) == max_fills:
+                    return
+            search.resume(Filler.distant_depth(search, fills, min_distance))
+
+    def start(self, search):
+        """Called once when a search starts, before any slot is chosen"""
+
+    def select_slot(self, search):
+        """Returns (slot, number of matches) of the next slot to fill"""
+        return search.tracker.fewest_matches()
+
+    @abstractmethod
+    def candidates(self, search, slot):
+        """Returns iterable of matches to try in the slot, in order"""
+
+    def place(self, search, slot, match):
+        """Places match in the slot if it is valid, returns whether it was placed"""
+        if not Filler.is_valid_match(search.crossword, search.wordlist, slot, match):
+            return False
+        search.crossword.put_word(match, slot)
+        return True
+
+    def backjump(self, search, failed_slot):
+        """
+        Returns depth of the frame to try the next match of after failed_slot failed, or -1 to give up.
+        Frames deeper than it are backtracked past. By default, backtracks chronologically.
+        """
+        return search.failed_depth(failed_slot) - 1
+
+    def nogood(self, search, failed_slot):
+        """
+        Returns (slot, word) assignments proven to have no solution now that failed_slot failed,
+        or None if the filler can't prove one. By default, a slot with no matches is blamed on the
+        frames that set its letters, and a frame that ran out of matches on every frame above it.
+        """
+        depth = search.failed_depth(failed_slot)
+        if depth == len(search.stack):
+            return Filler.setter_assignments(search, failed_slot)
+        return [(frame.slot, frame.word) for frame in search.stack[:depth]]
 
-        # if the grid is filled, succeed
-        if crossword.is_filled():
-            return True, None
+    def reject(self, search, slot, nogood):
+        """Called when the search skips a match for the slot because it would complete the nogood"""
 
-        # choose slot with fewest matches
-        slot, num_matches = Filler.fewest_matches(crossword, wordlist)
+    def resume(self, search, depth):
+        """Called when a filled search resumes from the frame at depth, after the frames below it are undone"""
 
-        # if some slot has zero matches, fail
-        if num_matches == 0:
-            return False, slot
+    @staticmethod
+    def setter_assignments(search, slot):
+        """Returns (slot, word) of the frames whose words set letters of the slot"""
+        crossings = search.crossword.crossings[slot]
+        return [(frame.slot, frame.word) for frame in search.stack if frame.slot in crossings]
+
+    @staticmethod
+    def deepest_crossing_depth(search, failed_slot):
+        """Returns depth of the deepest frame above the failed one whose slot crosses failed_slot, or -1"""
+        crossings = search.crossword.crossings[failed_slot]
+        for depth in reversed(range(search.failed_depth(failed_slot))):
+            if search.stack[depth].slot in crossings:
+                return depth
+        return -1
+
+    def checkpoint(self, search):
+        """Returns the filler's per-search state that rollback can restore, if it keeps any"""
 
-        # iterate through all possible matches in the fewest-match slot
-        previous_word = crossword.words[slot]
-        matches = wordlist.get_matches(
-            crossword.words[slot], crossword.constraints[slot]
+    def rollback(self, search, state):
+        """Restores per-search state returned by checkpoint"""
+
+    @staticmethod
+    def shuffled_matches(crossword, wordlist, slot, rng=random):
+        """Returns matches for the slot from highest to lowest score, in order shuffled by rng among matches with the same score"""
+        # sorted first, since the order of a set depends on string hashing and rng alone wouldn't reproduce the search
+        matches = sorted(
+            wordlist.get_matches(crossword.words[slot], crossword.constraints[slot])
         )
+        rng.shuffle(matches)
+        wordlist.sort_by_score(matches)
+        return matches
+
+    @staticmethod
+    def hamming_distance(letters, other_letters):
+        """Returns number of squares whose letters differ between two copies of a crossword's letters"""
+        return sum(map(ne, letters, other_letters))
+
+    @staticmethod
+    def distant_depth(search, fills, min_distance):
+        """
+        Returns depth of the deepest frame of a filled search whose next matches could still fill the crossword
+        at least min_distance squares differently from each of the fills, or -1 if no frame's could
+        """
+        crossword = search.crossword
+        letters = crossword.letters
+        trail = crossword.trail
+
+        # differences from each fill in squares set above the frame, and squares its next matches could change
+        distances = [Filler.hamming_distance(letters, fill) for fill in fills]
+        free = set()
+
+        end = len(trail)
+        for depth in reversed(range(len(search.stack))):
+            mark = search.stack[depth].mark
+            for square, _ in trail[mark:end]:
+                square_id = crossword.square_ids[square]
+                if square_id not in free:
+                    free.add(square_id)
+                    for i, fill in enumerate(fills):
+                        if letters[square_id] != fill[square_id]:
+                            distances[i] -= 1
+            end = mark
+
+            if all(distance + len(free) >= min_distance for distance in distances):
+                return depth
+        return -1
+
+    @staticmethod
+    def get_new_crossing_words(crossword, slot, word):
+        """
+        Returns list of (crossing slot, new word) that cross the given slot,
+        given a word to theoretically put in the slot. Excludes slots that were already filled.
+        """
+        slot_id = crossword.slot_ids[slot]
+        square_ids = crossword.slot_squares[slot_id]
+        letters = crossword.letters
+        new_words = {}
+
+        triples = iter(crossword.slot_crossings[slot_id])
+        for crossing_id, i, crossing_i in zip(triples, triples, triples):
+            letter = ord(word[i])
+            if letter == letters[square_ids[i]] and not crossword.slot_empties[crossing_id]:
+                # this word was already there, ignore
+                continue
+
+            new_word = new_words.get(crossing_id)
+            if new_word is None:
+                new_word = new_words[crossing_id] = crossword.slot_letters(crossing_id)
+            new_word[crossing_i] = letter
+
+        return [
+            (crossword.slot_list[crossing_id], new_word.decode())
+            for crossing_id, new_word in new_words.items()
+        ]
+
+    @staticmethod
+    def is_valid_match(crossword, wordlist, slot, match):
+        """Returns whether the match can be placed in the slot without creating a dupe or invalid word."""
+        return Filler.rejection_reason(crossword, wordlist, slot, match) is None
+
+    @staticmethod
+    def rejection_reason(crossword, wordlist, slot, match):
+        """Returns why the match can't be placed in the slot, or None if it can"""
+
+        if match not in wordlist.words:
+            return INVALID_WORD
+        if crossword.is_dupe(match):
+            return DUPE
+
+        new_crossing_words = Filler.get_new_crossing_words(crossword, slot, match)
+
+        # make sure crossing words are valid
+        for _, crossing_word in new_crossing_words:
+            if (
+                Crossword.is_word_filled(crossing_word)
+                and crossing_word not in wordlist.words
+            ):
+                return INVALID_CROSSING
+            if crossword.is_dupe(crossing_word):
+                return CROSSING_DUPE
+
+        # make sure completed crossing words don't dupe each other or the match
+        completed_words = [match] + [word for _, word in new_crossing_words if Crossword.is_word_filled(word)]
+        if len(set(completed_words)) != len(completed_words):
+            return CROSSING_DUPE
+
+        return None
+
+    @staticmethod
+    def fewest_matches(crossword, wordlist):
+        """Finds the slot that has the fewest possible matches, this is probably the best next place to look."""
+        fewest_matches_slot = None
+        fewest_matches = len(wordlist.words) + 1
+
+        for slot in crossword.words:
+            word = crossword.words[slot]
+            if Crossword.is_word_filled(word):
+                continue
+            matches = wordlist.count_matches(word, crossword.constraints[slot])
+            if matches < fewest_matches:
+                fewest_matches = matches
+                fewest_matches_slot = slot
+        return fewest_matches_slot, fewest_matches
+
+    @staticmethod
+    def score_matches(crossword, wordlist, slot, matches):
+        """
+        Returns, for each match, the log of the product of the number of possible words in each crossing slot
+        if the match were put in the slot, or -inf if that leaves some crossing slot with none.
+        Scores the whole batch one crossing at a time, so most crossings cost one letter count lookup per match.
+        """
+        scores = [0.0] * len(matches)
+
+        # (index in slot, index in crossing slot) of the squares each crossing slot shares with the slot
+        positions = {}
+        triples = iter(crossword.slot_crossings[crossword.slot_ids[slot]])
+        for crossing_id, i, crossing_i in zip(triples, triples, triples):
+            positions[crossing_id] = positions.get(crossing_id, ()) + ((i, crossing_i),)
+
+        for crossing_id, crossing_positions in positions.items():
+            if not crossword.slot_empties[crossing_id]:
+                # every match agrees with the letters already there, so this word won't change
+                continue
+            crossing_word = crossword.slot_word(crossing_id)
+            regex = crossword.slot_constraints[crossing_id]
+
+            if len(crossing_positions) == 1:
+                # number of crossing words with each letter at the crossing square, shared by every match
+                (i, crossing_i), = crossing_positions
+                counts = wordlist.get_count_table(crossing_word, regex)[crossing_i]
+                logs = {letter: math.log(num_matches) for letter, num_matches in counts.items()}
+                column = [logs.get(match[i], NEG_INF) for match in matches]
+            else:
+                # slots that cross more than once need the whole new crossing word
+                column = []
+                for match in matches:
+                    new_crossing_word = crossword.slot_letters(crossing_id)
+                    for i, crossing_i in crossing_positions:
+                        new_crossing_word[crossing_i] = ord(match[i])
+                    num_matches = wordlist.count_matches(new_crossing_word.decode(), regex)
+                    column.append(math.log(num_matches) if num_matches else NEG_INF)
+
+            scores = [score + value for score, value in zip(scores, column)]
+
+        return scores
+
+    @staticmethod
+    def minlook(crossword, wordlist, slot, matches, k):
+        """Considers given matches, returns index of the one that offers the most possible crossing words. If there are none, returns -1"""
+        # just take first k matches, and score them all at once
+        scores = Filler.score_matches(crossword, wordlist, slot, matches[:k])
+
+        # if no matches for some crossing slot, give up on the match
+        # this is basically "arc-consistency lookahead"
+        failed_indices = {
+            match_index for match_index, score in enumerate(scores) if score == NEG_INF
+        }
+
+        best_match_index = -1
+        best_cross_product = -1
+
+        for match_index, cross_product in enumerate(scores):
+            if cross_product > best_cross_product:
+                best_match_index = match_index
+                best_cross_product = cross_product
+
+        return best_match_index, failed_indices
+
+
+class DFSFiller(Filler):
+    """
+    Fills the crossword using a naive DFS algorithm:
+
+    - keeps selecting unfilled slot with fewest possible matches
+    - randomly chooses matching word for that slot
+    - backtracks if there is a slot with no matches
+    """
+
+    def candidates(self, search, slot):
+        return Filler.shuffled_matches(search.crossword, search.wordlist, slot, self.rng)
+
+
+class DFSBackjumpFiller(DFSFiller):
+    """
+    Fills the crossword using a naive DFS algorithm:
+
+    - keeps selecting unfilled slot with fewest possible matches
+    - randomly chooses matching word for that slot
+    - backtracks if there is a slot with no matches
+    - backjumps past slots that don't cross the failed slot
+
+    Returns (is_filled, failed_slot)
+    """
+
+    def fill(self, crossword, wordlist, animate, retry_time=None, nogoods=None, stats=None, observers=()):
+        search = Search(self, crossword, wordlist, animate, retry_time, nogoods, stats, observers)
+        return search.run(), search.failed_slot
+
+    def backjump(self, search, failed_slot):
+        return Filler.deepest_crossing_depth(search, failed_slot)
+
+    def nogood(self, search, failed_slot):
+        # frames that ran out of matches may have skipped solutions by jumping, so only slots without matches prove anything
+        if search.failed_depth(failed_slot) == len(search.stack):
+            return Filler.setter_assignments(search, failed_slot)
+        return None
+
+
+class ConflictBackjumpFiller(DFSFiller):
+    """
+    Fills the crossword using a DFS algorithm with conflict-directed backjumping (CBJ):
+
+    - keeps selecting unfilled slot with fewest possible matches
+    - randomly chooses matching word for that slot
+    - keeps a conflict set for every frame: the earlier frames whose words ruled out some of its matches
+    - when a slot fails, jumps back to the deepest frame in its conflict set, passing the rest of the set along
+
+    Returns (is_filled, failed_slot)
+    """
+
+    def fill(self, crossword, wordlist, animate, retry_time=None, nogoods=None, stats=None, observers=()):
+        search = Search(self, crossword, wordlist, animate, retry_time, nogoods, stats, observers)
+        return search.run(), search.failed_slot
+
+    def start(self, search):
+        search.conflicts = defaultdict(set)
+
+    def place(self, search, slot, match):
+        culprits = self.rejection_culprits(search, slot, match)
+        if culprits is None:
+            search.crossword.put_word(match, slot)
+            return True
+
+        depth = len(search.stack) - 1
+        search.conflicts[depth].update(culprit for culprit in culprits if culprit < depth)
+        return False
+
+    def reject(self, search, slot, nogood):
+        depth = len(search.stack) - 1
+        frame_depths = {frame.slot: i for i, frame in enumerate(search.stack)}
+        for other_slot, _ in nogood:
+            if other_slot in frame_depths:
+                culprits = {frame_depths[other_slot]}
+            else:
+                culprits = self.setter_depths(search, other_slot)
+            search.conflicts[depth].update(culprit for culprit in culprits if culprit < depth)
+
+    def resume(self, search, depth):
+        # conflict sets of the undone frames no longer apply, and the fill depends on every frame down to depth,
+        # so running out of matches there backtracks chronologically instead of jumping past frames with fills left
+        for undone_depth in [d for d in search.conflicts if d > depth]:
+            del search.conflicts[undone_depth]
+        search.conflicts[depth] = set(range(depth))
+
+    def nogood(self, search, failed_slot):
+        # the conflict set is exactly the frames the failure depends on
+        return [
+            (search.stack[depth].slot, search.stack[depth].word)
+            for depth in self.failure_conflicts(search, failed_slot)
+        ]
+
+    def failure_conflicts(self, search, failed_slot):
+        """Returns depths of the frames that caused failed_slot to fail"""
+        depth = search.failed_depth(failed_slot)
+
+        # slot's own matches were ruled out by the frames that set its letters
+        conflicts = self.setter_depths(search, failed_slot, depth)
+        if depth < len(search.stack):
+            conflicts |= search.conflicts.get(depth, set())
+        return conflicts
+
+    def backjump(self, search, failed_slot):
+        depth = search.failed_depth(failed_slot)
+        conflicts = self.failure_conflicts(search, failed_slot)
+        search.conflicts.pop(depth, None)
+
+        resume_depth = max(conflicts, default=-1)
+
+        # conflict sets of the frames jumped over no longer apply
+        for jumped_depth in [d for d in search.conflicts if d > resume_depth]:
+            del search.conflicts[jumped_depth]
+
+        if resume_depth >= 0:
+            conflicts.remove(resume_depth)
+            search.conflicts[resume_depth] |= conflicts
+
+        return resume_depth
+
+    @staticmethod
+    def setter_depths(search, slot, depth=None):
+        """Returns depths of frames shallower than depth that set letters of the slot"""
+        crossings = search.crossword.crossings[slot]
+        stack = search.stack[:depth]
+        return {i for i, frame in enumerate(stack) if frame.slot in crossings}
+
+    @staticmethod
+    def holder_depths(search, word):
+        """Returns depths of frames that set letters of slots that contain the word"""
+        depths = set()
+        for i, frame in enumerate(search.stack):
+            if frame.word == word:
+                depths.add(i)
+        for slot, slot_word in search.crossword.words.items():
+            if slot_word == word:
+                depths |= ConflictBackjumpFiller.setter_depths(search, slot)
+        return depths
+
+    @staticmethod
+    def rejection_culprits(search, slot, match):
+        """
+        Returns depths of the frames that rule out placing the match in the slot,
+        like Filler.is_valid_match, or None if the match is valid
+        """
+        crossword = search.crossword
+        wordlist = search.wordlist
+
+        if match not in wordlist.words:
+            return set()  # match is invalid word
+        if crossword.is_dupe(match):
+            return ConflictBackjumpFiller.holder_depths(search, match)
+
+        # slots completed by the match, including its own, for finding crossing words that dupe each other
+        completed_slots = {match: slot}
+
+        for crossing_slot, crossing_word in Filler.get_new_crossing_words(
+            crossword, slot, match
+        ):
+            if (
+                Crossword.is_word_filled(crossing_word)
+                and crossing_word not in wordlist.words
+            ):
+                # created invalid word
+                return ConflictBackjumpFiller.setter_depths(search, crossing_slot)
+            if crossword.is_dupe(crossing_word):
+                # created dupe
+                return ConflictBackjumpFiller.setter_depths(
+                    search, crossing_slot
+                ) | ConflictBackjumpFiller.holder_depths(search, crossing_word)
+            if Crossword.is_word_filled(crossing_word):
+                if crossing_word in completed_slots:
+                    # created two copies of the same word
+                    return ConflictBackjumpFiller.setter_depths(
+                        search, crossing_slot
+                    ) | ConflictBackjumpFiller.setter_depths(search, completed_slots[crossing_word])
+                completed_slots[crossing_word] = crossing_slot
+
+        return None
+
+
+class MinlookFiller(Filler):
+    """
+    Fills the crossword using a dfs algorithm with minlook heuristic:
+    - keeps selecting unfilled slot with fewest possible matches
+    - considers k random matching word, chooses word with the most possible crossing words (product of # in each slot)
+    - backtracks if there is a slot with no matches
+    """
+
+    def __init__(self, k, seed=None):
+        super().__init__(seed)
+        self.k = k
+
+    def candidates(self, search, slot):
+        crossword = search.crossword
+        wordlist = search.wordlist
+
+        # randomly shuffle matches
+        matches = Filler.shuffled_matches(crossword, wordlist, slot, self.rng)
+
+        # the search rolls the crossword back to this slot's state before asking for the next match
+        while matches:
+            match_index, failed_indices = Filler.minlook(
+                crossword, wordlist, slot, matches, self.k
+            )
+
+            if match_index != -1:
+                match = matches[match_index]
+
+            # remove failed matches and chosen match
+            matches = [
+                matches[i]
+                for i in range(len(matches))
+                if i != match_index and i not in failed_indices
+            ]
+
+            # if no matches were found, try another batch if possible
+            if match_index == -1:
+                continue
+
+            yield match
+
+
+class MinlookBackjumpFiller(MinlookFiller):
+    """
+    Fills the crossword using a dfs algorithm with minlook heuristic:
+    - keeps selecting unfilled slot with fewest possible matches
+    - considers k random matching word, chooses word with the most possible crossing words (product of # in each slot)
+    - backtracks if there is a slot with no matches
+    - backjumps past slots that don't cross the failed slot
+
+    Returns (is_filled, failed_slot)
+    """
+
+    def fill(self, crossword, wordlist, animate, retry_time=None, nogoods=None, stats=None, observers=()):
+        search = Search(self, crossword, wordlist, animate, retry_time, nogoods, stats, observers)
+        return search.run(), search.failed_slot
+
+    def backjump(self, search, failed_slot):
+        return Filler.deepest_crossing_depth(search, failed_slot)
+
+    def nogood(self, search, failed_slot):
+        # frames that ran out of matches may have skipped solutions by jumping, so only slots without matches prove anything
+        if search.failed_depth(failed_slot) == len(search.stack):
+            return Filler.setter_assignments(search, failed_slot)
+        return None
+
+
+class DomainStore:
+    """Undoable mapping from slot id to domain, the bitset of ids of words that can still go in the slot"""
+
+    def __init__(self):
+        self.domains = {}
+        """slot id => bitset of word ids"""
+
+        self.trail = []
+        """list of (slot id, previous domain) for every domain change, used for undo"""
+
+    def __getitem__(self, slot_id):
+        return self.domains[slot_id]
+
+    def __contains__(self, slot_id):
+        return slot_id in self.domains
+
+    def set(self, slot_id, domain):
+        self.trail.append((slot_id, self.domains.get(slot_id)))
+        self.domains[slot_id] = domain
+
+    def mark(self):
+        return len(self.trail)
+
+    def undo(self, mark):
+        """Restores every domain changed since the given mark"""
+        while len(self.trail) > mark:
+            slot_id, domain = self.trail.pop()
+            if domain is None:
+                del self.domains[slot_id]
+            else:
+                self.domains[slot_id] = domain
+
+
+class ArcConsistencyFiller(Filler):
+    """
+    Fills the crossword using a dfs algorithm with arc-consistency propagation:
+    - keeps a domain of candidate word ids for every unfilled slot
+    - keeps selecting unfilled slot with the smallest domain
+    - randomly chooses word from that slot's domain
+    - after each placement, runs AC-3 across crossings, removing words from crossing domains
+      whose letters no word in the crossing slot can match
+    - backtracks if some domain becomes empty, which catches dead ends several levels early
+    """
+
+    # slots are chosen by domain size, so the search doesn't need to recount matches after every placement
+    tracks_slots = False
+
+    def start(self, search):
+        crossword = search.crossword
+
+        search.bitset_index = search.wordlist.get_bitset_index()
+        search.domains = DomainStore()
+
+        # slot id => crossing slot id => ((index in slot, index in crossing slot), ...) of the squares they share
+        search.crossing_positions = []
+        for triples in crossword.slot_crossings:
+            positions = {}
+            triples = iter(triples)
+            for crossing_id, i, crossing_i in zip(triples, triples, triples):
+                positions[crossing_id] = positions.get(crossing_id, ()) + ((i, crossing_i),)
+            search.crossing_positions.append(positions)
+
+        # (slot id, crossing slot id) => letter bitsets of their shared squares, see letter_bitsets
+        search.letter_bitsets = {}
+
+        for slot_id in range(len(crossword.slot_list)):
+            if crossword.slot_empties[slot_id]:
+                search.domains.set(slot_id, self.initial_domain(search, slot_id))
+
+        # initial domains can't fail here, an empty one is picked up by select_slot
+        self.propagate(search, list(search.domains.domains))
+
+    def checkpoint(self, search):
+        return search.domains.mark()
+
+    def nogood(self, search, failed_slot):
+        # empty domains depend on propagation from every frame, not just the ones crossing the slot
+        depth = search.failed_depth(failed_slot)
+        return [(frame.slot, frame.word) for frame in search.stack[:depth]]
+
+    def rollback(self, search, state):
+        search.domains.undo(state)
+
+    def initial_domain(self, search, slot_id):
+        """Returns bitset of ids of words matching the pattern and constraint of the slot with the given id"""
+        index = search.bitset_index
+        pattern = search.crossword.slot_word(slot_id)
+        regex = search.crossword.slot_constraints[slot_id]
+
+        if not regex:
+            return index.mask(pattern)
+
+        domain = 0
+        for match in search.wordlist.get_matches(pattern, regex):
+            word_id = index.find(match)
+            if word_id is not None:
+                domain |= 1 << word_id
+        return domain
+
+    def select_slot(self, search):
+        """Returns unfilled slot with the smallest domain, and the size of its domain"""
+        crossword = search.crossword
+        slot_empties = crossword.slot_empties
+        smallest_id = None
+        smallest_size = len(search.wordlist.words) + 1
+
+        for slot_id, domain in search.domains.domains.items():
+            if not slot_empties[slot_id]:
+                continue
+            size = popcount(domain)
+            if size < smallest_size:
+                smallest_id = slot_id
+                smallest_size = size
+
+        if smallest_id is None:
+            return None, smallest_size
+        return crossword.slot_list[smallest_id], smallest_size
+
+    def candidates(self, search, slot):
+        domain = search.domains[search.crossword.slot_ids[slot]]
+        matches = sorted(search.bitset_index.decode(len(slot), domain))
+        self.rng.shuffle(matches)
+        search.wordlist.sort_by_score(matches)
+        return matches
+
+    def place(self, search, slot, match):
+        if not Filler.is_valid_match(search.crossword, search.wordlist, slot, match):
+            return False
+        search.crossword.put_word(match, slot)
+
+        slot_id = search.crossword.slot_ids[slot]
+        word_id = search.bitset_index.find(match)
+        search.domains.set(slot_id, 1 << word_id if word_id is not None else 0)
+
+        return self.propagate(search, [slot_id])
+
+    def propagate(self, search, slot_ids):
+        """
+        Runs AC-3 from the slots with the given ids, whose domains changed, until every arc is consistent.
+        Returns False if some domain became empty.
+        """
+        crossing_positions = search.crossing_positions
+        domains = search.domains.domains
+
+        queue = [(crossing_id, slot_id) for slot_id in slot_ids for crossing_id in crossing_positions[slot_id]]
+        queued = set(queue)
+
+        while queue:
+            arc = queue.pop()
+            queued.remove(arc)
+            slot_id, crossing_id = arc
+
+            if slot_id not in domains or crossing_id not in domains:
+                continue
+            if not self.revise(search, slot_id, crossing_id):
+                continue
+            if not domains[slot_id]:
+                return False
+
+            for other_id in crossing_positions[slot_id]:
+                if other_id != crossing_id and (other_id, slot_id) not in queued:
+                    queue.append((other_id, slot_id))
+                    queued.add((other_id, slot_id))
+
+        return True
+
+    def letter_bitsets(self, search, slot_id, crossing_id):
+        """
+        Returns, for each square the slots with the given ids share, list of (bitset of crossing words, bitset of words)
+        with each letter there, leaving out letters neither slot has words with. Computed once per arc of a search.
+        """
+        index = search.bitset_index
+        slot_squares = search.crossword.slot_squares
+        length = len(slot_squares[slot_id])
+        crossing_length = len(slot_squares[crossing_id])
+
+        letter_bitsets = []
+        for i, crossing_i in search.crossing_positions[slot_id][crossing_id]:
+            square_bitsets = []
+            for letter in index.letters(crossing_length, crossing_i):
+                crossing_bits = index.bitset(crossing_length, crossing_i, letter)
+                bits = index.bitset(length, i, letter)
+                if crossing_bits and bits:
+                    square_bitsets.append((crossing_bits, bits))
+            letter_bitsets.append(square_bitsets)
+
+        search.letter_bitsets[(slot_id, crossing_id)] = letter_bitsets
+        return letter_bitsets
+
+    def revise(self, search, slot_id, crossing_id):
+        """
+        Removes words from the domain of the slot with id slot_id that no word in the domain of the crossing slot
+        agrees with, returns whether it changed
+        """
+        domain = search.domains[slot_id]
+        crossing_domain = search.domains[crossing_id]
+        revised = domain
+
+        letter_bitsets = search.letter_bitsets.get((slot_id, crossing_id))
+        if letter_bitsets is None:
+            letter_bitsets = self.letter_bitsets(search, slot_id, crossing_id)
+
+        for square_bitsets in letter_bitsets:
+            # words with a letter at this square that some crossing word has there too
+            supported = 0
+            for crossing_bits, bits in square_bitsets:
+                if crossing_domain & crossing_bits:
+                    supported |= bits
+            revised &= supported
+
+        if revised == domain:
+            return False
+
+        search.domains.set(slot_id, revised)
+        return True
+
+
+class RecordingFiller(Filler):
+    """
+    Wraps a filler, recording the decisions of its searches so ReplayFiller can repeat them exactly:
+    every slot chosen and the matches tried in it, in order, whether they were placed, rejected or pruned.
+    """
+
+    def __init__(self, filler):
+        self.filler = filler
+        self.rng = filler.rng
+        self.tracks_slots = filler.tracks_slots
+
+        self.decisions = []
+        """list of [slot, number of matches, list of matches tried] for every slot chosen, in order"""
+
+    def start(self, search):
+        self.decisions = []
+        self.filler.start(search)
+
+    def select_slot(self, search):
+        slot, num_matches = self.filler.select_slot(search)
+        self.decisions.append([slot, num_matches, []])
+        return slot, num_matches
+
+    def candidates(self, search, slot):
+        tried = self.decisions[-1][2]
+        for match in self.filler.candidates(search, slot):
+            tried.append(match)
+            yield match
+
+    def place(self, search, slot, match):
+        return self.filler.place(search, slot, match)
+
+    def backjump(self, search, failed_slot):
+        return self.filler.backjump(search, failed_slot)
+
+    def nogood(self, search, failed_slot):
+        return self.filler.nogood(search, failed_slot)
+
+    def reject(self, search, slot, nogood):
+        self.filler.reject(search, slot, nogood)
+
+    def resume(self, search, depth):
+        self.filler.resume(search, depth)
 
-        # randomly shuffle matches
-        matches = list(matches)
-        shuffle(matches)
+    def checkpoint(self, search):
+        return self.filler.checkpoint(search)
 
-        while matches:
-            match_index, failed_indices = Filler.minlook(
-                crossword, wordlist, slot, matches, self.k
-            )
+    def rollback(self, search, state):
+        self.filler.rollback(search, state)
 
-            if match_index != -1:
-                match = matches[match_index]
+    def save(self, filepath):
+        """Writes the decisions of the last search to a JSON file"""
+        with open(filepath, 'w') as f:
+            json.dump({'filler': type(self.filler).__name__, 'decisions': self.decisions}, f)
 
-            # remove failed matches and chosen match
-            matches = [
-                matches[i]
-                for i in range(len(matches))
-                if i != match_index and i not in failed_indices
-            ]
 
-            # if no matches were found, try another batch if possible
-            if match_index == -1:
-                continue
+class ReplayFiller(RecordingFiller):
+    """
+    Wraps a filler, repeating the decisions recorded by a RecordingFiller instead of choosing slots and ordering matches.
+    Every other callback runs the wrapped filler, so replaying a search under a profiler expands the same nodes
+    and places, rejects and backjumps the same way as the recorded one, whatever the seed or string hashing.
+    Running out of decisions raises RetryException, as the recorded search must have been cut off there.
+    """
 
-            if not Filler.is_valid_match(crossword, wordlist, slot, match):
-                continue
+    def __init__(self, filler, decisions):
+        super().__init__(filler)
+        self.decisions = decisions
 
-            crossword.put_word(match, slot)
+    @classmethod
+    def from_file(cls, filler, filepath):
+        """Returns ReplayFiller for the decisions in a JSON file written by RecordingFiller.save"""
+        with open(filepath, 'r') as f:
+            log = json.load(f)
+        if log['filler'] != type(filler).__name__:
+            raise ValueError(f'decisions were recorded by {log["filler"]}, not {type(filler).__name__}')
+        decisions = log['decisions']
+        for decision in decisions:
+            decision[0] = tuple(tuple(square) for square in decision[0])
+        return cls(filler, decisions)
+
+    def start(self, search):
+        search.replay_index = 0
+        self.filler.start(search)
+
+    def select_slot(self, search):
+        if search.replay_index == len(self.decisions):
+            raise RetryException()
 
-            is_filled, failed_slot = self.fill(crossword, wordlist, animate, retry_time)
-            if is_filled:
-                return True, None
-            if failed_slot not in crossword.crossings[slot]:
-                # undo this word, keep backjumping
-                crossword.put_word(previous_word, slot)
-                return False, failed_slot
+        slot, num_matches, _ = self.decisions[search.replay_index]
+        if slot not in search.crossword.slot_ids or Crossword.is_word_filled(search.crossword.words[slot]):
+            raise ValueError(f'search diverged from the recorded decisions at decision {search.replay_index}')
+        search.replay_index += 1
+        return slot, num_matches
 
-        # if no match works, restore previous word
-        crossword.put_word(previous_word, slot)
-        return False, slot
+    def candidates(self, search, slot):
+        return self.decisions[search.replay_index - 1][2]
 
 
 class Miner:
@@ -759,48 +3557,432 @@ class Miner:
     retrying after a given number of seconds.
     """
 
-    def __init__(self, filler: Filler, retry_seconds: int):
+    def __init__(self, filler: Filler, retry_seconds: int, nogoods=None, seed=None):
         self.filler = filler
         self.retry_seconds = retry_seconds
 
+        # every attempt reseeds the filler from this, so a Miner with the same seed makes the same attempts
+        self.rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+
+        # nogoods learned by each attempt are kept for the next ones
+        self.nogoods = nogoods if nogoods is not None else NogoodStore()
+
     def fill(self, crossword_maker, wordlist, animate):
         retries = 0
 
         while True:
             retry_time = time.time() + self.retry_seconds
             crossword = crossword_maker()
+            self.filler.rng.seed(self.rng.randrange(2**32))
 
             try:
-                self.filler.fill(crossword, wordlist, animate, retry_time)
+                self.filler.fill(crossword, wordlist, animate, retry_time, self.nogoods)
                 break
             except RetryException:
                 retries += 1
                 print(f'Attempt #{retries} timed out. Retrying.')
 
         print(crossword)
+        return crossword
+
+
+FILLED = 'filled'
+TIMED_OUT = 'timed out'
+EXHAUSTED = 'exhausted'
+ERROR = 'error'
+
+# (crossword_maker, wordlist) of the running portfolio, inherited by forked workers
+portfolio_context = None
+
+
+def portfolio_attempt(filler, seed, retry_seconds):
+    """Runs one portfolio attempt in a worker process, returns (status, words)"""
+    crossword_maker, wordlist = portfolio_context
+
+    filler.rng.seed(seed)
+    crossword = crossword_maker()
+    retry_time = time.time() + retry_seconds if retry_seconds else None
+
+    try:
+        filler.fill(crossword, wordlist, False, retry_time)
+    except RetryException:
+        return TIMED_OUT, None
+
+    if not crossword.is_validly_filled(wordlist):
+        return EXHAUSTED, None
+    return FILLED, dict(crossword.words)
+
+
+class PortfolioMiner:
+    """
+    Races a portfolio of fillers with different seeds in a pool of worker processes,
+    returning the first valid fill and terminating the other attempts.
+
+    Whenever an attempt times out or runs out of matches, the next filler in the
+    portfolio is started with a new seed. Workers are forked, so they share the
+    parent's wordlist instead of each unpickling a copy.
+    """
+
+    def __init__(self, fillers, num_workers=None, retry_seconds=None, seed=None):
+        self.fillers = fillers
+        self.num_workers = num_workers or os.cpu_count()
+        self.retry_seconds = retry_seconds
+        self.seed = random.randrange(2**32) if seed is None else seed
+
+        self.winner = None
+        """(filler, seed) of the attempt that filled the last crossword"""
+
+    def __race(self):
+        """Runs attempts until one fills the crossword, returns its (filler, seed, words)"""
+        results = queue.Queue()
+        attempts = count()
+        exhausted = set()  # indexes of the fillers that ran out of matches
+
+        # leaving the with block terminates the remaining attempts
+        with multiprocessing.get_context('fork').Pool(self.num_workers) as pool:
+
+            def submit():
+                attempt = next(attempts)
+                index = attempt % len(self.fillers)
+                seed = self.seed + attempt
+                pool.apply_async(
+                    portfolio_attempt,
+                    (self.fillers[index], seed, self.retry_seconds),
+                    callback=lambda result: results.put((index, seed, *result)),
+                    error_callback=lambda error: results.put((index, seed, error, None)),
+                )
+
+            for _ in range(self.num_workers):
+                submit()
+
+            while True:
+                index, seed, status, words = results.get()
+                if isinstance(status, Exception):
+                    raise status
+                if status == FILLED:
+                    return self.fillers[index], seed, words
+                if status == EXHAUSTED:
+                    # give up once every filler in the portfolio has run out of matches,
+                    # not after as many exhausted attempts, which could all be the same filler's
+                    exhausted.add(index)
+                    if len(exhausted) == len(self.fillers):
+                        return None
+                submit()
+
+    def fill(self, crossword_maker, wordlist):
+        """Returns crossword filled by the first successful attempt, or None if every filler gave up"""
+        global portfolio_context
+        portfolio_context = (crossword_maker, wordlist)
+
+        try:
+            result = self.__race()
+        finally:
+            portfolio_context = None
+
+        if result is None:
+            return None
+
+        filler, seed, words = result
+        self.winner = (filler, seed)
+
+        crossword = crossword_maker()
+        for slot, word in words.items():
+            crossword.put_word(word, slot)
+        return crossword
+
+
+# (wordlist, default job fields) of the running batch, inherited by forked workers
+batch_context = None
+
+
+def batch_fill(job):
+    """Fills one grid of a batch in a worker process, returns its result"""
+    wordlist, defaults = batch_context
+    return fill_job({**defaults, **job}, wordlist)
+
+
+def check_grid(grid):
+    """Raises ValueError unless the grid is a non-empty list of rows, strings of the same non-zero length"""
+    if (
+        not isinstance(grid, list)
+        or not grid
+        or not all(isinstance(row, str) for row in grid)
+        or not grid[0]
+        or any(len(row) != len(grid[0]) for row in grid)
+    ):
+        raise ValueError('grid must be a non-empty list of rows of the same length')
+
+
+def fill_job(job, wordlist, deadline_time=None):
+    """
+    Fills one job's grid, within its budget and by deadline_time if given,
+    returns its result with its id, status, filled grid, nodes, backtracks and seconds
+    """
+    result = {'id': job.get('id')}
+
+    tic = time.time()
+    try:
+        grid = job['grid']
+        if isinstance(grid, str):
+            grid = read_grid(grid)
+        check_grid(grid)
+        crossword = AmericanCrossword.from_grid(grid)
+
+        for constraint in job.get('constraints', ()):
+            slot = tuple(tuple(square) for square in constraint['slot'])
+            if slot not in crossword.slot_ids:
+                raise ValueError(f'grid has no slot {slot}')
+            crossword.add_constraint(slot, constraint['regex'])
+
+        filler = get_filler(argparse.Namespace(strategy=job.get('strategy'), k=job.get('k'), seed=job.get('seed')))
+        if filler is None:
+            raise ValueError(f'unknown strategy {job.get("strategy")}')
+
+        budget = job.get('budget')
+        retry_time = time.time() + budget if budget else None
+        if deadline_time is not None:
+            retry_time = deadline_time if retry_time is None else min(retry_time, deadline_time)
+        search = Search(filler, crossword, wordlist, retry_time=retry_time, min_score=job.get('min_score'))
+
+        try:
+            status = FILLED if search.run() else EXHAUSTED
+        except RetryException:
+            status = TIMED_OUT
+
+        result.update(
+            status=status,
+            grid=crossword.get_grid() if status == FILLED else None,
+            nodes=search.nodes,
+            backtracks=search.backtracks,
+        )
+    except (OSError, KeyError, TypeError, ValueError, re.error) as error:
+        result.update(status=ERROR, error=f'{type(error).__name__}: {error}')
+
+    result['seconds'] = round(time.time() - tic, 4)
+    return result
+
+
+def fill_batch(jobs, wordlist, num_workers=None, defaults=None):
+    """
+    Fills every job's grid in a pool of worker processes, yielding results as they finish.
+    A job is a dictionary with the grid, either a filepath or a list of rows, and optionally
+    its id, strategy, k, constraints, seed, budget in seconds and min_score, any of which can be given defaults.
+    Workers are forked, so they share the parent's wordlist instead of each loading a copy.
+    """
+    global batch_context
+    batch_context = (wordlist, defaults or {})
+
+    try:
+        with multiprocessing.get_context('fork').Pool(num_workers or os.cpu_count()) as pool:
+            yield from pool.imap_unordered(batch_fill, jobs)
+    finally:
+        batch_context = None
+
+
+def read_manifest(filepath):
+    """Returns list of jobs in a JSONL manifest, with ids defaulting to line numbers and grid filepaths relative to the manifest"""
+    dirname = os.path.dirname(filepath)
+    jobs = []
+    with open(filepath, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            job.setdefault('id', line_number)
+            if isinstance(job.get('grid'), str):
+                job['grid'] = os.path.join(dirname, job['grid'])
+            jobs.append(job)
+    return jobs
+
+
+def run_batch(args, wordlist):
+    """Fills every grid in the manifest, printing one JSON result per line and throughput at the end"""
+    jobs = read_manifest(args.batch_path)
+    defaults = {'strategy': args.strategy, 'k': args.k, 'budget': args.retry_seconds}
+    statuses = Counter()
+
+    tic = time.time()
+    for result in fill_batch(jobs, wordlist, args.num_workers, defaults):
+        statuses[result['status']] += 1
+        print(json.dumps(result), flush=True)
+    duration = time.time() - tic
+
+    # results go to stdout, so the summary goes to stderr
+    print(
+        f'Filled {statuses[FILLED]} of {len(jobs)} grids in {duration:.4f} seconds, '
+        f'{len(jobs) / duration:.2f} grids per second '
+        f'({statuses[TIMED_OUT]} timed out, {statuses[EXHAUSTED]} exhausted, {statuses[ERROR]} errors)',
+        file=sys.stderr,
+    )
 
 
 WORDLIST_FOLDER = 'wordlist/'
 GRID_FOLDER = 'grid/'
 GRID_SUFFIX = '.txt'
 
+COMPILED_SUFFIX = '.swc'
+COMPILED_MAGIC = b'SWRD'
+COMPILED_VERSION = 1
+COMPILED_HEADER = '<4sHBxi32sH'
+COMPILED_TABLE = '<HIQQQ'
+
 
 def read_grid(filepath):
     with open(filepath, 'r') as f:
         return f.read().splitlines()
 
 
-def read_wordlist(filepath, scored=True, min_score=50):
+def read_scored_words(filepath, scored=True, min_score=50):
+    """Returns dictionary mapping each word in the wordlist file with a high enough score to its score"""
     with open(filepath, 'r') as f:
-        words = f.readlines()
+        words = f.read().splitlines()
 
     words = [w.upper() for w in words]
 
-    if scored:
-        words = [w.split(';') for w in words]
-        words = [w[0] for w in words if len(w) == 1 or int(w[1]) >= min_score]
+    if not scored:
+        return {w: 0 for w in words}
+
+    words = [w.split(';') for w in words]
+    return {
+        w[0]: int(w[1]) if len(w) > 1 else 0
+        for w in words
+        if len(w) == 1 or int(w[1]) >= min_score
+    }
+
+
+def read_wordlist(filepath, scored=True, min_score=50, index='set', cache_size=None):
+    if filepath.endswith(COMPILED_SUFFIX):
+        return read_compiled_wordlist(filepath, scored, min_score, cache_size)
+
+    return Wordlist(read_scored_words(filepath, scored, min_score), index, cache_size)
+
+
+def file_checksum(filepath):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def compile_wordlist(filepath, compiled_filepath=None, scored=True, min_score=50):
+    """
+    Writes words, scores and bitset indices of the wordlist to a binary file that
+    read_compiled_wordlist can memory-map without parsing. Returns path of the compiled file.
+
+    Layout, all little-endian:
+    - header: magic, version, scored, min_score, sha256 of the source file, alphabet
+    - table of lengths: length, count, offsets of the words, scores and bitsets of that length
+    - words of each length, sorted and fixed-width, so a word's id is its position
+    - scores of each length, as unsigned shorts
+    - bitsets of each length, for each index and each letter of the alphabet
+    """
+    compiled_filepath = compiled_filepath or filepath + COMPILED_SUFFIX
+
+    scores = read_scored_words(filepath, scored, min_score)
+    index = BitsetIndex(scores)
+    alphabet = ''.join(sorted({letter for word in scores for letter in word}))
+    lengths = sorted(index.words)
+
+    header = struct.pack(
+        COMPILED_HEADER,
+        COMPILED_MAGIC,
+        COMPILED_VERSION,
+        scored,
+        min_score,
+        file_checksum(filepath),
+        len(alphabet),
+    )
+    header += alphabet.encode('ascii') + struct.pack('<H', len(lengths))
+
+    offset = len(header) + len(lengths) * struct.calcsize(COMPILED_TABLE)
+    tables = []
+    blocks = []
+    for length in lengths:
+        words = index.words[length]
+        num_bytes = len(words) // 8 + 1
+
+        words_block = ''.join(words).encode('ascii')
+        scores_block = struct.pack(f'<{len(words)}H', *(scores[word] for word in words))
+        bitsets_block = b''.join(
+            index.bitsets[length][i][letter].to_bytes(num_bytes, 'little')
+            for i in range(length)
+            for letter in alphabet
+        )
+
+        words_offset = offset
+        scores_offset = words_offset + len(words_block)
+        bitsets_offset = scores_offset + len(scores_block)
+        offset = bitsets_offset + len(bitsets_block)
+
+        tables.append(
+            struct.pack(
+                COMPILED_TABLE,
+                length,
+                len(words),
+                words_offset,
+                scores_offset,
+                bitsets_offset,
+            )
+        )
+        blocks += [words_block, scores_block, bitsets_block]
+
+    with open(compiled_filepath, 'wb') as f:
+        f.write(header)
+        f.writelines(tables)
+        f.writelines(blocks)
+
+    return compiled_filepath
+
+
+def read_compiled_header(mm):
+    """Returns fields of the header of a compiled wordlist"""
+    magic, version, scored, min_score, checksum, alphabet_length = struct.unpack_from(
+        COMPILED_HEADER, mm
+    )
+    if magic != COMPILED_MAGIC:
+        raise ValueError('Not a compiled wordlist')
+    if version != COMPILED_VERSION:
+        raise ValueError(
+            f'Compiled wordlist has version {version}, expected {COMPILED_VERSION}, recompile it'
+        )
+
+    offset = struct.calcsize(COMPILED_HEADER)
+    alphabet = mm[offset : offset + alphabet_length].decode('ascii')
+    offset += alphabet_length
+
+    (num_lengths,) = struct.unpack_from('<H', mm, offset)
+    offset += 2
+
+    tables = {}
+    for _ in range(num_lengths):
+        length, *table = struct.unpack_from(COMPILED_TABLE, mm, offset)
+        tables[length] = tuple(table)
+        offset += struct.calcsize(COMPILED_TABLE)
+
+    return {
+        'scored': bool(scored),
+        'min_score': min_score,
+        'checksum': checksum,
+        'alphabet': alphabet,
+        'tables': tables,
+    }
 
-    return Wordlist(words)
+
+def read_compiled_wordlist(filepath, scored=True, min_score=50, cache_size=None):
+    """
+    Memory-maps a wordlist written by compile_wordlist. If the source wordlist is next to it,
+    checks that the compiled file is still up to date with it.
+    """
+    index = CompiledIndex(filepath)
+
+    if (index.scored, index.min_score) != (scored, min_score):
+        raise ValueError(
+            f'{filepath} was compiled with scored={index.scored}, min_score={index.min_score}, recompile it'
+        )
+
+    source_filepath = filepath[: -len(COMPILED_SUFFIX)]
+    if os.path.exists(source_filepath) and file_checksum(source_filepath) != index.checksum:
+        raise ValueError(f'{filepath} is out of date with {source_filepath}, recompile it')
+
+    return Wordlist(CompiledWords(index), index, cache_size)
 
 
 def log_times(times, strategy):
@@ -812,27 +3994,473 @@ def log_times(times, strategy):
 
 def get_filler(args):
     if args.strategy == 'dfs':
-        return DFSFiller()
+        return DFSFiller(args.seed)
     elif args.strategy == 'dfsb':
-        return DFSBackjumpFiller()
+        return DFSBackjumpFiller(args.seed)
     elif args.strategy == 'minlook':
-        return MinlookFiller(args.k)
+        return MinlookFiller(args.k, args.seed)
     elif args.strategy == 'mlb':
-        return MinlookBackjumpFiller(args.k)
+        return MinlookBackjumpFiller(args.k, args.seed)
+    elif args.strategy == 'ac3':
+        return ArcConsistencyFiller(args.seed)
+    elif args.strategy == 'cbj':
+        return ConflictBackjumpFiller(args.seed)
     else:
         return None
 
 
+def get_portfolio(args):
+    return [
+        DFSFiller(),
+        DFSBackjumpFiller(),
+        MinlookFiller(args.k),
+        MinlookBackjumpFiller(args.k),
+    ]
+
+
+BENCHMARK_STRATEGIES = ['dfs', 'dfsb', 'minlook', 'mlb', 'ac3', 'cbj']
+BENCHMARK_KS = [5, 10]
+BENCHMARK_BUDGET = 10
+BENCHMARK_NOISE_SECONDS = 0.01
+BENCHMARK_VERSION = 1
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of values, interpolating between the closest ranks"""
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100
+    lo = math.floor(rank)
+    hi = math.ceil(rank)
+    return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+
+def benchmark_trial(grid, filler, wordlist, seed, budget):
+    """Fills the grid once with the seeded filler, returns (filled, seconds, nodes, backtracks)"""
+    filler.rng.seed(seed)
+    crossword = AmericanCrossword.from_grid(grid)
+
+    tic = time.perf_counter()
+    search = Search(filler, crossword, wordlist, retry_time=time.time() + budget)
+    try:
+        filled = search.run()
+    except RetryException:
+        filled = False
+    duration = time.perf_counter() - tic
+
+    return filled, duration, search.nodes, search.backtracks
+
+
+def benchmark_case(grid, make_filler, wordlist, trials, budget):
+    """
+    Returns statistics of filling the grid once per trial, trial i seeded with i.
+    Peak memory is measured by tracing an extra run of the first seed, so that tracing doesn't slow the timed trials.
+    """
+    results = [
+        benchmark_trial(grid, make_filler(), wordlist, seed, budget) for seed in range(trials)
+    ]
+    filled, times, nodes, backtracks = zip(*results)
+
+    tracemalloc.start()
+    benchmark_trial(grid, make_filler(), wordlist, 0, budget)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'trials': trials,
+        'filled': sum(filled),
+        'median': percentile(times, 50),
+        'p90': percentile(times, 90),
+        'min': min(times),
+        'max': max(times),
+        'nodes': percentile(nodes, 50),
+        'nodes_per_second': sum(nodes) / sum(times),
+        'backtracks': percentile(backtracks, 50),
+        'peak_memory': peak_memory,
+        'times': times,
+    }
+
+
+def benchmark(wordlist, grid_paths, strategies=BENCHMARK_STRATEGIES, ks=BENCHMARK_KS, trials=5, budget=BENCHMARK_BUDGET):
+    """
+    Yields (grid name, strategy, k, statistics) of filling every grid with every strategy,
+    once per k for minlook strategies. Each trial that isn't filled within budget seconds counts as unfilled.
+    """
+    for grid_path in grid_paths:
+        grid = read_grid(grid_path)
+        name = os.path.basename(grid_path)
+        for strategy in strategies:
+            for k in ks if strategy in ('minlook', 'mlb') else [None]:
+                filler_args = argparse.Namespace(strategy=strategy, k=k, seed=None)
+                stats = benchmark_case(grid, lambda: get_filler(filler_args), wordlist, trials, budget)
+                yield name, strategy, k, stats
+
+
+def compare_benchmark(cases, baseline_cases, tolerance):
+    """
+    Returns list of (case, baseline case, ratio of medians) for cases slower than the baseline by more than
+    the tolerance, or that filled fewer trials. Cases are matched by grid, strategy and k.
+    Slowdowns under BENCHMARK_NOISE_SECONDS are ignored, since the medians of tiny grids are mostly noise.
+    """
+    baseline_by_key = {
+        (case['grid'], case['strategy'], case['k']): case for case in baseline_cases
+    }
+    regressions = []
+    for case in cases:
+        baseline_case = baseline_by_key.get((case['grid'], case['strategy'], case['k']))
+        if baseline_case is None:
+            continue
+        ratio = case['median'] / baseline_case['median']
+        slower = case['median'] - baseline_case['median'] > BENCHMARK_NOISE_SECONDS
+        if (slower and ratio > 1 + tolerance) or case['filled'] < baseline_case['filled']:
+            regressions.append((case, baseline_case, ratio))
+    return regressions
+
+
+def run_benchmark(args, wordlist, wordlist_path, grid_path_prefix):
+    """Runs the benchmark suite over every bundled grid, writing results to args.benchmark_path and comparing them to args.baseline_path"""
+    grid_paths = sorted(
+        os.path.join(grid_path_prefix, name)
+        for name in os.listdir(grid_path_prefix)
+        if name.endswith(GRID_SUFFIX)
+    )
+    budget = args.retry_seconds or BENCHMARK_BUDGET
+
+    cases = []
+    for name, strategy, k, stats in benchmark(wordlist, grid_paths, ks=args.ks, trials=args.num_trials, budget=budget):
+        label = strategy if k is None else f'{strategy} k={k}'
+        print(
+            f'{name:16} {label:14} filled {stats["filled"]}/{stats["trials"]}  '
+            f'median {stats["median"]:.4f}s  p90 {stats["p90"]:.4f}s  '
+            f'{stats["nodes_per_second"]:.0f} nodes/s  {stats["backtracks"]:.0f} backtracks  '
+            f'{stats["peak_memory"] / 2**20:.1f} MiB',
+            flush=True,
+        )
+        cases.append({'grid': name, 'strategy': strategy, 'k': k, **stats})
+
+    results = {
+        'version': BENCHMARK_VERSION,
+        'python': platform.python_version(),
+        'wordlist': os.path.basename(wordlist_path),
+        'min_score': args.min_score,
+        'index': args.index,
+        'trials': args.num_trials,
+        'budget': budget,
+        'cases': cases,
+    }
+    with open(args.benchmark_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Wrote results of {len(cases)} cases to {args.benchmark_path}')
+
+    if args.baseline_path:
+        with open(args.baseline_path, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_benchmark(cases, baseline['cases'], args.tolerance)
+        for case, baseline_case, ratio in regressions:
+            label = case['strategy'] if case['k'] is None else f'{case["strategy"]} k={case["k"]}'
+            print(
+                f'Regression: {case["grid"]} {label} median {case["median"]:.4f}s vs '
+                f'{baseline_case["median"]:.4f}s ({ratio:.2f}x), '
+                f'filled {case["filled"]} vs {baseline_case["filled"]}'
+            )
+        print(f'{len(regressions)} regressions against {args.baseline_path}')
+        if regressions:
+            sys.exit(1)
+
+
+SERVER_QUEUE_SIZE = 64
+SERVER_LATENCY_WINDOW = 1000
+
+# seconds a request without a deadline or budget can take, and how much longer the server waits for its worker
+SERVER_TIMEOUT = 60
+SERVER_TIMEOUT_GRACE = 5
+
+# (wordlists by name, default job fields) of the running server, inherited by forked workers
+server_context = None
+
+
+def timed_out_result(job, seconds=0):
+    """Returns result of a request that timed out before its search finished"""
+    return {'id': job.get('id'), 'status': TIMED_OUT, 'grid': None, 'nodes': 0, 'backtracks': 0, 'seconds': seconds}
+
+
+def is_positive_number(value):
+    """Returns whether a JSON value is a number greater than 0, which booleans aren't"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def server_fill(job, deadline_time):
+    """Fills one request's grid in a worker process, returns its result, timing out without a search if its deadline passed in the queue"""
+    wordlists, defaults = server_context
+    job = {**defaults, **job}
+    wordlist = wordlists[job.get('wordlist') or next(iter(wordlists))]
+
+    if deadline_time is not None:
+        remaining = deadline_time - time.time()
+        if remaining <= 0:
+            return timed_out_result(job)
+
+    return fill_job(job, wordlist, deadline_time)
+
+
+class FillRequestHandler(BaseHTTPRequestHandler):
+    """Serves POST /fill and GET /metrics for the FillServer that owns its server"""
+
+    def do_POST(self):
+        if self.path != '/fill':
+            self.send_json(404, {'error': f'no endpoint {self.path}'})
+            return
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except ValueError as error:
+            self.send_json(400, {'error': f'invalid JSON: {error}'})
+            return
+        self.send_json(*self.server.fill_server.submit(job))
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_json(404, {'error': f'no endpoint {self.path}'})
+            return
+        self.send_json(200, self.server.fill_server.metrics())
+
+    def send_json(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if code == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # every request is counted in the metrics instead
+        pass
+
+
+class FillServer:
+    """
+    Fills grids posted as JSON to a local HTTP server, keeping its indexed wordlists loaded between requests.
+
+    A request is a batch job, with its grid as a list of rows, optionally the name of the wordlist to fill it
+    with and a deadline in seconds that includes time spent queued. Requests without a deadline or budget
+    get a deadline of timeout seconds. Requests are filled by a pool of forked worker processes, which share
+    the parent's wordlists. At most num_workers requests are filled and queue_size more wait at a time,
+    and any others are rejected with status 503 until the queue drains.
+    """
+
+    def __init__(
+        self,
+        wordlists,
+        host='127.0.0.1',
+        port=0,
+        num_workers=None,
+        queue_size=SERVER_QUEUE_SIZE,
+        defaults=None,
+        timeout=SERVER_TIMEOUT,
+    ):
+        global server_context
+        self.wordlists = wordlists
+        self.num_workers = num_workers or os.cpu_count()
+        self.queue_size = queue_size
+        self.defaults = defaults or {}
+        self.timeout = timeout
+
+        self.in_flight = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.statuses = Counter()
+        self.latencies = deque(maxlen=SERVER_LATENCY_WINDOW)
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(self.num_workers + queue_size)
+
+        # the pool forks before the server starts any threads, and forks again if a worker dies
+        server_context = (wordlists, self.defaults)
+        self.pool = multiprocessing.get_context('fork').Pool(self.num_workers)
+
+        self.httpd = ThreadingHTTPServer((host, port), FillRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fill_server = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def validate(self, job):
+        """Returns why a request can't be queued, or None if it can"""
+        if not isinstance(job, dict):
+            return 'request must be a JSON object'
+        try:
+            check_grid(job.get('grid'))
+        except ValueError as error:
+            return str(error)
+        wordlist = job.get('wordlist')
+        if wordlist is not None and not isinstance(wordlist, str):
+            return 'wordlist must be a string'
+        if wordlist is not None and wordlist not in self.wordlists:
+            return f'unknown wordlist {wordlist}'
+        deadline = job.get('deadline')
+        if deadline is not None and not is_positive_number(deadline):
+            return 'deadline must be a positive number of seconds'
+        budget = job.get('budget')
+        if budget is not None and not is_positive_number(budget):
+            return 'budget must be a positive number of seconds'
+        min_score = job.get('min_score')
+        if min_score is not None and (not isinstance(min_score, (int, float)) or isinstance(min_score, bool)):
+            return 'min_score must be a number'
+        return None
+
+    def submit(self, job):
+        """Queues a request and waits for it to be filled, returns (HTTP status code, response body)"""
+        error = self.validate(job)
+        if error is not None:
+            with self.lock:
+                self.invalid += 1
+            return 400, {'error': error}
+
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            return 503, {'error': 'queue is full'}
+
+        tic = time.time()
+        deadline_time = tic + job['deadline'] if job.get('deadline') else None
+        if deadline_time is None and not job.get('budget', self.defaults.get('budget')):
+            deadline_time = tic + self.timeout
+
+        # a worker stuck past the deadline doesn't hold the request up for long after it
+        wait = None if deadline_time is None else deadline_time - tic + SERVER_TIMEOUT_GRACE
+        with self.lock:
+            self.in_flight += 1
+        try:
+            result = self.pool.apply_async(server_fill, (job, deadline_time)).get(wait)
+        except multiprocessing.TimeoutError:
+            result = timed_out_result(job, round(time.time() - tic, 4))
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.slots.release()
+
+        with self.lock:
+            self.latencies.append(time.time() - tic)
+            self.statuses[result['status']] += 1
+        return (400 if result['status'] == ERROR else 200), result
+
+    def metrics(self):
+        """Returns dictionary of queue depth, request counts by status, rejected and invalid requests, and latency percentiles in seconds"""
+        with self.lock:
+            latencies = list(self.latencies)
+            return {
+                'uptime': round(time.time() - self.start_time, 4),
+                'workers': self.num_workers,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - self.num_workers),
+                'queue_size': self.queue_size,
+                'requests': sum(self.statuses.values()),
+                'rejected': self.rejected,
+                'invalid': self.invalid,
+                'statuses': dict(self.statuses),
+                'latency': {
+                    f'p{p}': round(percentile(latencies, p), 4) for p in (50, 90, 99)
+                } if latencies else None,
+                'wordlists': list(self.wordlists),
+            }
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self):
+        """Serves requests on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Stops serving and terminates the workers"""
+        global server_context
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+        self.httpd.server_close()
+        self.pool.terminate()
+        self.pool.join()
+        server_context = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def request_json(url, body=None, timeout=None):
+    """Sends body as JSON to a fill server, or gets url if body is None, returns (HTTP status code, response body)"""
+    data = None if body is None else json.dumps(body).encode()
+    request = urllib.request.Request(url, data, {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def request_fill(server_url, job, timeout=None):
+    """Posts a fill request to the fill server at server_url, returns (HTTP status code, result)"""
+    return request_json(server_url + '/fill', job, timeout)
+
+
+def request_metrics(server_url, timeout=None):
+    """Returns metrics of the fill server at server_url"""
+    return request_json(server_url + '/metrics', timeout=timeout)[1]
+
+
+def run_server(args, wordlist, wordlist_path):
+    """Serves fill requests until interrupted, with the wordlist named after its file"""
+    defaults = {'strategy': args.strategy, 'k': args.k, 'budget': args.retry_seconds}
+    wordlists = {os.path.basename(wordlist_path): wordlist}
+    server = FillServer(
+        wordlists, port=args.serve_port, num_workers=args.num_workers, queue_size=args.queue_size, defaults=defaults
+    )
+    with server:
+        print(f'Serving {", ".join(wordlists)} at {server.url} with {server.num_workers} workers', file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
 def run(args):
     dirname = os.path.dirname(__file__)
     wordlist_path_prefix = os.path.join(dirname, WORDLIST_FOLDER)
     grid_path_prefix = os.path.join(dirname, GRID_FOLDER)
 
+    wordlist_path = args.wordlist_path or wordlist_path_prefix + 'spreadthewordlist.dict'
+
+    if args.compile:
+        compiled_path = compile_wordlist(wordlist_path, min_score=args.min_score)
+        print(f'Compiled {wordlist_path} to {compiled_path}')
+        return
+
     wordlist = read_wordlist(
-        args.wordlist_path or wordlist_path_prefix + 'spreadthewordlist.dict',
+        wordlist_path,
         min_score=args.min_score,
+        index=args.index,
+        cache_size=args.cache_size,
     )
 
+    if args.batch_path:
+        run_batch(args, wordlist)
+        return
+
+    if args.benchmark_path:
+        run_benchmark(args, wordlist, wordlist_path, grid_path_prefix)
+        return
+
+    if args.serve_port is not None:
+        run_server(args, wordlist, wordlist_path)
+        return
+
     grid_path = grid_path_prefix + args.grid_path
     if not grid_path.endswith(GRID_SUFFIX):
         grid_path = grid_path + GRID_SUFFIX
@@ -840,13 +4468,67 @@ def run(args):
     grid = read_grid(grid_path)
     times = []
 
+    if args.num_fills:
+        tic = time.time()
+        crossword = AmericanCrossword.from_grid(grid)
+        fills = get_filler(args).iter_fills(crossword, wordlist, args.num_fills, args.min_distance)
+        for fill_number, crossword in enumerate(fills, 1):
+            print(crossword)
+            print(f'\nFill #{fill_number} found after {time.time() - tic:.4f} seconds\n')
+        return
+
+    # every search appends its events to the trace, each starting with a start event
+    trace_file = open(args.trace_path, 'w') if args.trace_path else None
+
+    # every trial fills the same grid, so nogoods proven by one trial hold for the next
+    nogoods = NogoodStore()
+
     for _ in range(args.num_trials):
         tic = time.time()
 
-        crossword = AmericanCrossword.from_grid(grid)
-        filler = get_filler(args)
+        # a replay only repeats a search if it starts with the same nogoods as the recorded one
+        if args.record_path or args.replay_path:
+            nogoods = NogoodStore()
+
+        if args.portfolio:
+            miner = PortfolioMiner(
+                get_portfolio(args), args.num_workers, args.retry_seconds, args.seed
+            )
+            crossword = miner.fill(lambda: AmericanCrossword.from_grid(grid), wordlist)
+            if crossword is None:
+                print('Every filler in the portfolio gave up, grid is unfillable')
+                return
+            winner, seed = miner.winner
+            print(f'{type(winner).__name__} with seed {seed} filled the grid first')
+        else:
+            crossword = AmericanCrossword.from_grid(grid)
+            filler = get_filler(args)
+            if args.record_path:
+                filler = RecordingFiller(filler)
+            elif args.replay_path:
+                filler = ReplayFiller.from_file(filler, args.replay_path)
+
+            stats = SearchStats() if args.stats else None
+            observers = []
+            if args.animate:
+                observers.append(AnimationRenderer(args.fps))
+            if trace_file is not None:
+                observers.append(TraceWriter(trace_file))
+
+            search = Search(filler, crossword, wordlist, nogoods=nogoods, stats=stats, observers=observers)
+            try:
+                search.run()
+            except RetryException:
+                print(f'Replay ran out of decisions after {search.nodes} nodes')
 
-        filler.fill(crossword, wordlist, args.animate)
+            if args.record_path:
+                filler.save(args.record_path)
+
+            if search.backjumps:
+                print(
+                    f'{len(search.backjumps)} of {search.backtracks} backtracks jumped, '
+                    f'skipping {sum(search.backjumps)} levels, at most {max(search.backjumps)}'
+                )
 
         duration = time.time() - tic
 
@@ -859,7 +4541,13 @@ def run(args):
             f'\nFilled {crossword.cols}x{crossword.rows} crossword in {duration:.4f} seconds\n'
         )
 
-    log_times(times, args.strategy)
+        if args.stats and not args.portfolio:
+            print(f'{stats}\n')
+
+    if trace_file is not None:
+        trace_file.close()
+
+    log_times(times, 'portfolio' if args.portfolio else args.strategy)
 
 
 def main():
@@ -881,6 +4569,28 @@ def main():
         default=50,
         help='minimum word score',
     )
+    parser.add_argument(
+        '--compile',
+        default=False,
+        action='store_true',
+        help='compile the wordlist to a memory-mappable file and exit',
+    )
+    parser.add_argument(
+        '-i',
+        '--index',
+        dest='index',
+        type=str,
+        default='set',
+        help='which pattern index to use: set, bitset, trie',
+    )
+    parser.add_argument(
+        '-c',
+        '--cache-size',
+        dest='cache_size',
+        type=int,
+        default=None,
+        help='maximum number of cached patterns, unlimited by default',
+    )
     parser.add_argument(
         '-g',
         '--grid',
@@ -904,13 +4614,27 @@ def main():
         action='store_true',
         help='whether to animate grid filling',
     )
+    parser.add_argument(
+        '--fps',
+        dest='fps',
+        type=float,
+        default=ANIMATION_FPS,
+        help='maximum number of frames per second to animate',
+    )
+    parser.add_argument(
+        '--trace',
+        dest='trace_path',
+        type=str,
+        default=None,
+        help='filepath to write every search event to as JSONL',
+    )
     parser.add_argument(
         '-s',
         '--strategy',
         dest='strategy',
         type=str,
         default='dfs',
-        help='which algorithm to run: dfs, dfsb, minlook, mlb',
+        help='which algorithm to run: dfs, dfsb, minlook, mlb, ac3, cbj',
     )
     parser.add_argument(
         '-k', '--k', dest='k', type=int, default=5, help='k constant for minlook'
@@ -923,6 +4647,113 @@ def main():
         default=None,
         help='number of seconds after which to reshuffle wordlist and retry',
     )
+    parser.add_argument(
+        '-p',
+        '--portfolio',
+        default=False,
+        action='store_true',
+        help='race every strategy with different seeds in parallel, first fill wins',
+    )
+    parser.add_argument(
+        '-n',
+        '--num-workers',
+        dest='num_workers',
+        type=int,
+        default=None,
+        help='number of worker processes for the portfolio, batch or server, defaults to number of cores',
+    )
+    parser.add_argument(
+        '-b',
+        '--batch',
+        dest='batch_path',
+        type=str,
+        default=None,
+        help='filepath for a JSONL manifest of grids to fill, printing one JSON result per grid',
+    )
+    parser.add_argument(
+        '--serve',
+        dest='serve_port',
+        type=int,
+        default=None,
+        help='serve fill requests over HTTP on this localhost port, keeping the wordlist loaded',
+    )
+    parser.add_argument(
+        '--queue-size',
+        dest='queue_size',
+        type=int,
+        default=SERVER_QUEUE_SIZE,
+        help='number of fill requests the server queues beyond its workers before rejecting more',
+    )
+    parser.add_argument(
+        '--benchmark',
+        dest='benchmark_path',
+        type=str,
+        default=None,
+        help='run every strategy on every bundled grid for the number of trials, writing JSON results to this filepath',
+    )
+    parser.add_argument(
+        '--baseline',
+        dest='baseline_path',
+        type=str,
+        default=None,
+        help='filepath of earlier benchmark results to compare against, exiting with status 1 on regressions',
+    )
+    parser.add_argument(
+        '--ks',
+        dest='ks',
+        type=int,
+        nargs='+',
+        default=BENCHMARK_KS,
+        help='k constants to benchmark minlook strategies with',
+    )
+    parser.add_argument(
+        '--tolerance',
+        dest='tolerance',
+        type=float,
+        default=0.25,
+        help='fraction by which a benchmark median can exceed its baseline before it counts as a regression',
+    )
+    parser.add_argument(
+        '--num-fills',
+        dest='num_fills',
+        type=int,
+        default=None,
+        help='number of distinct fills to stream from one search, instead of restarting for every trial',
+    )
+    parser.add_argument(
+        '--min-distance',
+        dest='min_distance',
+        type=int,
+        default=1,
+        help='minimum number of squares in which every streamed fill differs from the others',
+    )
+    parser.add_argument(
+        '--seed',
+        dest='seed',
+        type=int,
+        default=None,
+        help='seed for the random order in which fillers try matches',
+    )
+    parser.add_argument(
+        '--record',
+        dest='record_path',
+        type=str,
+        default=None,
+        help='filepath to write the decisions of the search to, so it can be replayed',
+    )
+    parser.add_argument(
+        '--replay',
+        dest='replay_path',
+        type=str,
+        default=None,
+        help='filepath of recorded decisions to repeat instead of choosing slots and matches',
+    )
+    parser.add_argument(
+        '--stats',
+        default=False,
+        action='store_true',
+        help='print counters and timings of each search',
+    )
     args = parser.parse_args()
 
     run(args)
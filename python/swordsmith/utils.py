@@ -1,4 +1,7 @@
 import os
 
+# moves the cursor to the top left and clears the screen, which is much faster than running a clear command
+CLEAR_TERMINAL = '\x1b[H\x1b[2J'
+
 def clear_terminal():
-    os.system('cls' if os.name == 'nt' else 'clear')
\ No newline at end of file
+    os.system('cls' if os.name == 'nt' else 'clear')
@@ -1,4 +1,15 @@
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 import unittest
 
 sys.path.append('../swordsmith')
@@ -54,6 +65,17 @@ class Test5xMinlookBackjump(unittest.TestCase):
         self.assertTrue(crossword.is_validly_filled(wordlist))
 
 
+class Test5xConflictBackjump(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        filler = sw.ConflictBackjumpFiller()
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
 class Test15xDFS(unittest.TestCase):
     def runTest(self):
         grid = sw.read_grid(GRID_15x)
@@ -98,6 +120,39 @@ class Test15xMinlookBackjump(unittest.TestCase):
         self.assertTrue(crossword.is_validly_filled(wordlist))
 
 
+class Test5xArcConsistency(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        filler = sw.ArcConsistencyFiller()
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class Test15xArcConsistency(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        filler = sw.ArcConsistencyFiller()
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class Test15xConflictBackjump(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        filler = sw.ConflictBackjumpFiller()
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
 class TestConstraintsDFS(unittest.TestCase):
     def runTest(self):
         grid = sw.read_grid(GRID_5x)
@@ -154,4 +209,881 @@ class TestConstraintsMinlookBackjump(unittest.TestCase):
         self.assertTrue(crossword.is_validly_filled(wordlist))
 
 
+class Test5xBitsetIndex(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST, index='bitset')
+        filler = sw.MinlookFiller(5)
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestBitsetIndexMatches(unittest.TestCase):
+    def runTest(self):
+        set_wordlist = sw.read_wordlist(WORDLIST)
+        bitset_wordlist = sw.read_wordlist(WORDLIST, index='bitset')
+
+        for pattern in ['.....', 'S..E.', 'Q.....Z', '...............', 'ZZZZ']:
+            matches = set_wordlist.get_matches(pattern, '')
+            self.assertEqual(set(bitset_wordlist.get_matches(pattern, '')), set(matches))
+            self.assertEqual(bitset_wordlist.count_matches(pattern, ''), len(matches))
+
+        bitset_wordlist.add_word('ZZZZ')
+        self.assertEqual(bitset_wordlist.index.matches('ZZZ.'), {'ZZZZ'})
+        bitset_wordlist.remove_word('ZZZZ')
+        self.assertEqual(bitset_wordlist.index.count('ZZZ.'), 0)
+
+
+class Test5xTrieIndex(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST, index='trie')
+        filler = sw.MinlookFiller(5)
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestTrieIndexMatches(unittest.TestCase):
+    def runTest(self):
+        words = sw.read_wordlist(WORDLIST).words
+        set_index = sw.SetIndex(words)
+        trie_index = sw.TrieIndex(words)
+
+        for pattern in ['.....', 'S..E.', '....S', 'Q.....Z', '...............', 'ZZZZ', 'Q#...']:
+            matches = set_index.matches(pattern)
+            self.assertEqual(trie_index.matches(pattern), matches)
+            self.assertEqual(trie_index.count(pattern), len(matches))
+            self.assertEqual(trie_index.count_table(pattern), set_index.count_table(pattern))
+
+        letter_classes = sw.Constraint('^[^S]..E[A-D]$', 5).letter_classes
+        self.assertEqual(trie_index.class_matches(5, letter_classes), set_index.class_matches(5, letter_classes))
+
+        trie_index.add('ZZZZ')
+        trie_index.remove('ZERO')
+        self.assertEqual(trie_index.matches('ZZZ.'), {'ZZZZ'})
+        self.assertEqual(trie_index.count('Z...'), set_index.count('Z...'))
+        self.assertNotIn('ZERO', trie_index.class_matches(4, [None] * 4))
+
+        trie_index.remove('ZZZZ')
+        trie_index.add('ZERO')
+        self.assertEqual(trie_index.count('ZZZ.'), 0)
+        self.assertEqual(trie_index.matches('Z...'), set_index.matches('Z...'))
+
+
+class TestPatternCache(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST, cache_size=2)
+
+        wordlist.get_matches('A....', '')
+        wordlist.get_matches('B....', '')
+        wordlist.get_matches('A....', '')
+        wordlist.get_matches('C....', '')
+        stats = wordlist.pattern_matches.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertNotIn(('B....', '', None), wordlist.pattern_matches)
+
+        self.assertNotIn('AZZZZ', wordlist.get_matches('A...Z', ''))
+        count = wordlist.count_matches('.ZZZZ', '')
+        wordlist.add_word('AZZZZ')
+        self.assertNotIn(('A...Z', '', None), wordlist.pattern_matches)
+        self.assertIn(('C....', '', None), wordlist.pattern_matches)
+        self.assertIn('AZZZZ', wordlist.get_matches('A...Z', ''))
+        self.assertEqual(wordlist.count_matches('.ZZZZ', ''), count + 1)
+
+        wordlist.remove_word('AZZZZ')
+        self.assertNotIn('AZZZZ', wordlist.get_matches('A...Z', ''))
+        self.assertEqual(wordlist.count_matches('.ZZZZ', ''), count)
+
+
+class TestScoreThreshold(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST, min_score=0)
+        high_wordlist = sw.read_wordlist(WORDLIST, min_score=50)
+
+        for pattern, regex in [('.....', ''), ('S..E.', ''), ('Q.....Z', ''), ('....', '^[AEIOU]')]:
+            matches = high_wordlist.get_matches(pattern, regex)
+            self.assertEqual(wordlist.get_matches(pattern, regex, min_score=50), matches)
+            self.assertEqual(wordlist.count_matches(pattern, regex, min_score=50), len(matches))
+            self.assertEqual(wordlist.get_count_table(pattern, regex, min_score=50), high_wordlist.get_count_table(pattern, regex))
+            self.assertLessEqual(len(matches), wordlist.count_matches(pattern, regex))
+
+        # thresholds no word falls below use the main index
+        self.assertEqual(wordlist.get_matches('S..E.', min_score=0), wordlist.get_matches('S..E.'))
+        self.assertEqual(list(wordlist.score_masks), [])
+
+        wordlist.add_word('ZZZZZ', score=60)
+        self.assertEqual(wordlist.score('ZZZZZ'), 60)
+        self.assertIn('ZZZZZ', wordlist.get_matches('ZZZZ.', min_score=50))
+        wordlist.remove_word('ZZZZZ')
+        self.assertNotIn('ZZZZZ', wordlist.get_matches('ZZZZ.', min_score=50))
+
+        words = sorted(wordlist.get_matches('S..E.'))
+        wordlist.sort_by_score(words)
+        scores = [wordlist.score(word) for word in words]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        # a search with a threshold only sees words scoring at least that, in every lookup
+        view = wordlist.at_least(50)
+        self.assertEqual(len(view.words), len(high_wordlist.words))
+        self.assertNotIn(next(word for word, score in wordlist.scores.items() if score < 50), view.words)
+        self.assertEqual(view.get_matches('S..E.'), high_wordlist.get_matches('S..E.'))
+        for filler in [sw.MinlookFiller(5, seed=0), sw.ArcConsistencyFiller(0)]:
+            crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+            self.assertTrue(sw.Search(filler, crossword, wordlist, min_score=50).run())
+            self.assertTrue(crossword.is_validly_filled(high_wordlist))
+
+        # slots are ordered by their counts at the threshold, not in the whole wordlist
+        crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+        search = sw.Search(sw.MinlookFiller(5, seed=0), crossword, wordlist, min_score=50)
+        for slot, count in search.tracker.counts.items():
+            self.assertEqual(count, search.wordlist.count_matches(crossword.words[slot], crossword.constraints[slot]))
+        self.assertLess(search.tracker.fewest_matches()[1], wordlist.count_matches('.....'))
+
+        # thresholds round up to the next score level, and bitset indexes AND a mask per level into their pattern masks
+        bitset_wordlist = sw.read_wordlist(WORDLIST, min_score=0, index='bitset')
+        self.assertIs(bitset_wordlist.at_least(41), bitset_wordlist.at_least(50))
+        for pattern in ['.....', 'S..E.', 'Q.....Z']:
+            self.assertEqual(bitset_wordlist.get_matches(pattern, min_score=45), high_wordlist.get_matches(pattern))
+            self.assertEqual(bitset_wordlist.count_matches(pattern, min_score=41), len(high_wordlist.get_matches(pattern)))
+            self.assertEqual(bitset_wordlist.get_count_table(pattern, min_score=50), high_wordlist.get_count_table(pattern))
+        self.assertEqual(list(bitset_wordlist.score_masks), [50])
+        index = bitset_wordlist.at_least(50).get_bitset_index()
+        self.assertIs(index.base, bitset_wordlist.index)
+        self.assertEqual(index.matches('S..E.'), high_wordlist.get_matches('S..E.'))
+        for min_score in range(sw.SCORE_MASK_CACHE_SIZE + 10):
+            bitset_wordlist.get_score_mask(5, min_score)
+        self.assertEqual(len(bitset_wordlist.score_masks), sw.SCORE_MASK_CACHE_SIZE)
+
+        job = {'grid': sw.read_grid(GRID_5x), 'strategy': 'mlb', 'k': 5, 'min_score': 50}
+        result = sw.fill_job(job, wordlist)
+        self.assertTrue(sw.AmericanCrossword.from_grid(result['grid']).is_validly_filled(high_wordlist))
+
+
+class TestWordlistSession(unittest.TestCase):
+    def runTest(self):
+        base = sw.read_wordlist(WORDLIST)
+        session = base.session()
+        other_session = base.session()
+
+        with self.assertRaises(TypeError):
+            base.add_word('ZZZZZ')
+
+        matches = base.get_matches('SCRO.')
+        count_table = base.get_count_table('SCRO.')
+        session.add_word('ZZZZZ', score=60)
+        session.remove_word('SCROD')
+
+        self.assertIn('ZZZZZ', session.get_matches('ZZZZ.'))
+        self.assertNotIn('ZZZZZ', other_session.get_matches('ZZZZ.'))
+        self.assertNotIn('ZZZZZ', base.get_matches('ZZZZ.'))
+        self.assertEqual(session.get_matches('SCRO.'), matches - {'SCROD'})
+        self.assertEqual(other_session.get_matches('SCRO.'), matches)
+        self.assertEqual(session.count_matches('SCRO.'), len(matches) - 1)
+        self.assertEqual(session.get_count_table('SCRO.')[4]['D'], count_table[4]['D'] - 1)
+        self.assertIn('ZZZZZ', session.get_matches('.....', '^Z', min_score=60))
+        self.assertEqual(session.score('ZZZZZ'), 60)
+        self.assertIsNone(session.score('SCROD'))
+
+        self.assertNotIn('SCROD', session.words)
+        self.assertIn('SCROD', other_session.words)
+        self.assertEqual(len(session.words), len(base.words))
+        self.assertEqual(set(session.words), base.words - {'SCROD'} | {'ZZZZZ'})
+
+        session.add_word('SCROD')
+        session.remove_word('ZZZZZ')
+        self.assertEqual(session.get_matches('SCRO.'), matches)
+        self.assertNotIn('ZZZZZ', session.get_matches('ZZZZ.'))
+
+        crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+        sw.MinlookFiller(5).fill(crossword, session, animate=False)
+        self.assertTrue(crossword.is_validly_filled(session))
+
+
+class TestSessionBitsetIndex(unittest.TestCase):
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            compiled_path = sw.compile_wordlist(
+                WORDLIST, os.path.join(directory, 'wordlist.dict' + sw.COMPILED_SUFFIX)
+            )
+            for base in [sw.read_wordlist(WORDLIST), sw.read_wordlist(compiled_path)]:
+                session = base.session()
+                self.assertIs(session.get_bitset_index(), base.get_bitset_index())
+
+                # edited sessions overlay their edits on the base's index instead of copying it
+                session.add_word('ZZZZZ', score=60)
+                session.remove_word('SCROD')
+                index = session.get_bitset_index()
+                self.assertIsInstance(index, sw.SessionBitsetIndex)
+                self.assertIs(index.base, base.get_bitset_index())
+
+                session.add_word('ZZZZY')
+                session.remove_word('ZZZZZ')
+                session.remove_word('SCRAM')
+                session.add_word('SCROD')
+                expected = sw.BitsetIndex(session.words)
+                for pattern in ['.....', 'SCR..', 'ZZZZ.', '....Y', 'Q.....Z']:
+                    self.assertEqual(index.matches(pattern), expected.matches(pattern))
+                    self.assertEqual(index.count_table(pattern), expected.count_table(pattern))
+                self.assertIsNone(index.find('ZZZZZ'))
+                self.assertIsNone(index.find('SCRAM'))
+                self.assertEqual(index.word(5, index.find('ZZZZY')), 'ZZZZY')
+
+                crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+                self.assertTrue(sw.Search(sw.ArcConsistencyFiller(0), crossword, session).run())
+                self.assertTrue(crossword.is_validly_filled(session))
+
+
+class TestCountTable(unittest.TestCase):
+    def runTest(self):
+        for index in sw.INDEXES:
+            wordlist = sw.read_wordlist(WORDLIST, index=index)
+
+            patterns = [('.....', ''), ('S..E.', ''), ('Q.....Z', ''), ('....', 'AB')]
+            for pattern, regex in patterns:
+                table = wordlist.get_count_table(pattern, regex)
+                self.assertEqual(len(table), len(pattern))
+                for i, counts in enumerate(table):
+                    for letter in 'AEQSZ':
+                        new_pattern = pattern[:i] + letter + pattern[i + 1 :]
+                        if pattern[i] in (sw.EMPTY, letter):
+                            expected = wordlist.count_matches(new_pattern, regex)
+                        else:
+                            expected = 0
+                        self.assertEqual(counts.get(letter, 0), expected)
+
+            wordlist.get_count_table('ZZZ.', '')
+            wordlist.add_word('ZZZZ')
+            self.assertEqual(wordlist.get_count_table('ZZZ.', '')[3]['Z'], 1)
+            wordlist.remove_word('ZZZZ')
+
+
+class TestScoreMatches(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+
+        slot = next(iter(crossword.slots))
+        crossing_slot = next(iter(crossword.crossings[slot]))
+        word = min(wordlist.get_matches(crossword.words[crossing_slot], ''))
+        crossword.put_word(word, crossing_slot)
+        matches = sorted(wordlist.get_matches(crossword.words[slot], ''))[:100]
+
+        for match, score in zip(
+            matches, sw.Filler.score_matches(crossword, wordlist, slot, matches)
+        ):
+            cross_product = 0
+            for _, crossing_word in sw.Filler.get_new_crossing_words(
+                crossword, slot, match
+            ):
+                num_matches = wordlist.count_matches(crossing_word, '')
+                if num_matches == 0:
+                    cross_product = float('-inf')
+                    break
+                cross_product += math.log(num_matches)
+            self.assertAlmostEqual(score, cross_product)
+
+
+class TestCompiledWordlist(unittest.TestCase):
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            compiled_path = sw.compile_wordlist(
+                WORDLIST, os.path.join(directory, 'wordlist.dict' + sw.COMPILED_SUFFIX)
+            )
+            compiled_wordlist = sw.read_wordlist(compiled_path)
+            wordlist = sw.read_wordlist(WORDLIST)
+
+            self.assertEqual(len(compiled_wordlist.words), len(wordlist.words))
+            self.assertIn('SCROD', compiled_wordlist.words)
+            for pattern in ['.....', 'S..E.', 'Q.....Z', '...............']:
+                self.assertEqual(
+                    compiled_wordlist.get_matches(pattern, ''),
+                    set(wordlist.get_matches(pattern, '')),
+                )
+
+            grid = sw.read_grid(GRID_5x)
+            crossword = sw.AmericanCrossword.from_grid(grid)
+            sw.MinlookFiller(5).fill(crossword, compiled_wordlist, animate=False)
+            self.assertTrue(crossword.is_validly_filled(wordlist))
+
+            # filling sorts matches by score without reading every score out of the file
+            self.assertIsNone(compiled_wordlist.scores)
+            matches = list(compiled_wordlist.get_matches('S..E.', ''))
+            compiled_wordlist.sort_by_score(matches)
+            self.assertEqual([wordlist.score(match) for match in matches], sorted(map(wordlist.score, matches), reverse=True))
+            self.assertEqual(compiled_wordlist.score('SCROD'), wordlist.score('SCROD'))
+
+
+class TestCompiledWordlistOutOfDate(unittest.TestCase):
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source_path = os.path.join(directory, 'wordlist.dict')
+            with open(source_path, 'w') as f:
+                f.write('scrod;50\nroget;50\n')
+
+            compiled_path = sw.compile_wordlist(source_path)
+            self.assertEqual(sw.read_wordlist(compiled_path).get_matches('R....', ''), {'ROGET'})
+
+            with open(source_path, 'a') as f:
+                f.write('taupe;50\n')
+            with self.assertRaises(ValueError):
+                sw.read_wordlist(compiled_path)
+
+
+class Test15xPortfolio(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        wordlist = sw.read_wordlist(WORDLIST)
+        miner = sw.PortfolioMiner(
+            [sw.DFSFiller(), sw.MinlookBackjumpFiller(5)], num_workers=2, seed=0
+        )
+
+        crossword = miner.fill(lambda: sw.AmericanCrossword.from_grid(grid), wordlist)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+        self.assertIsNotNone(miner.winner)
+
+
+class ExhaustedFiller(sw.DFSFiller):
+    """DFSFiller that runs out of matches at the first slot"""
+
+    def candidates(self, search, slot):
+        return iter(())
+
+
+class TestPortfolioExhausted(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        wordlist = sw.read_wordlist(WORDLIST)
+
+        # both of the first three attempts' ExhaustedFillers give up before the DFSFiller fills the grid
+        miner = sw.PortfolioMiner([ExhaustedFiller(), sw.DFSFiller()], num_workers=3, seed=0)
+        crossword = miner.fill(lambda: sw.AmericanCrossword.from_grid(grid), wordlist)
+        self.assertIsNotNone(crossword)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+        self.assertIsInstance(miner.winner[0], sw.DFSFiller)
+        self.assertNotIsInstance(miner.winner[0], ExhaustedFiller)
+
+        miner = sw.PortfolioMiner([ExhaustedFiller(), ExhaustedFiller()], num_workers=2, seed=0)
+        self.assertIsNone(miner.fill(lambda: sw.AmericanCrossword.from_grid(grid), wordlist))
+
+
+class TestBatch(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        slot = [[0, 0], [0, 1], [0, 2], [0, 3]]
+        jobs = [
+            {'id': 'file', 'grid': GRID_5x},
+            {'id': 'inline', 'grid': ['....'] * 4, 'constraints': [{'slot': slot, 'regex': '^S'}]},
+            {'id': 'bad', 'grid': ['....'] * 4, 'constraints': [{'slot': [[9, 9]], 'regex': '^S'}]},
+            {'id': 'ragged', 'grid': ['...', '..']},
+            {'id': 'empty', 'grid': []},
+        ]
+
+        results = {
+            result['id']: result
+            for result in sw.fill_batch(jobs, wordlist, num_workers=2, defaults={'strategy': 'mlb', 'k': 5, 'seed': 0})
+        }
+        self.assertEqual(results['file']['status'], sw.FILLED)
+        self.assertEqual(results['inline']['status'], sw.FILLED)
+        self.assertTrue(results['inline']['grid'][0].startswith('S'))
+        self.assertEqual(results['bad']['status'], sw.ERROR)
+        self.assertEqual(results['ragged']['status'], sw.ERROR)
+        self.assertEqual(results['empty']['status'], sw.ERROR)
+
+        crossword = sw.AmericanCrossword.from_grid(results['file']['grid'])
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestFillServer(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        grid = sw.read_grid(GRID_5x)
+
+        with sw.FillServer({'main': wordlist}, num_workers=1, queue_size=0, defaults={'strategy': 'mlb', 'k': 5}, timeout=1) as server:
+            server.start()
+
+            code, result = sw.request_fill(server.url, {'id': 'mini', 'grid': grid, 'wordlist': 'main'})
+            self.assertEqual((code, result['status']), (200, sw.FILLED))
+            self.assertTrue(sw.AmericanCrossword.from_grid(result['grid']).is_validly_filled(wordlist))
+
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid, 'wordlist': 'other'})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': ['.....', '...']})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': []})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid, 'budget': '5'})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid, 'wordlist': ['main']})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid, 'deadline': True})[0], 400)
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid, 'strategy': 'none'})[1]['status'], sw.ERROR)
+
+            # an open 15x15 occupies the only worker until its deadline, so the next request is rejected
+            slow = []
+            open_grid = ['.' * 15] * 15
+            thread = threading.Thread(
+                target=lambda: slow.append(sw.request_fill(server.url, {'grid': open_grid, 'strategy': 'dfs', 'deadline': 1}))
+            )
+            thread.start()
+            while sw.request_metrics(server.url)['in_flight'] == 0:
+                time.sleep(0.01)
+            self.assertEqual(sw.request_fill(server.url, {'grid': grid})[0], 503)
+            thread.join()
+            self.assertEqual(slow[0][1]['status'], sw.TIMED_OUT)
+
+            # requests without a deadline or budget time out after the server's timeout
+            code, result = sw.request_fill(server.url, {'grid': open_grid, 'strategy': 'dfs'})
+            self.assertEqual((code, result['status']), (200, sw.TIMED_OUT))
+
+            metrics = sw.request_metrics(server.url)
+            self.assertEqual(metrics['rejected'], 1)
+            self.assertEqual(metrics['invalid'], 6)
+            self.assertEqual(metrics['in_flight'], 0)
+            self.assertEqual(metrics['statuses'], {sw.FILLED: 1, sw.ERROR: 1, sw.TIMED_OUT: 2})
+            self.assertLessEqual(metrics['latency']['p50'], metrics['latency']['p99'])
+
+
+class TestBenchmark(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        results = list(sw.benchmark(wordlist, [GRID_5x], strategies=['dfs', 'mlb'], ks=[5], trials=3))
+
+        self.assertEqual([(grid, strategy, k) for grid, strategy, k, _ in results], [('5x.txt', 'dfs', None), ('5x.txt', 'mlb', 5)])
+        for _, _, _, stats in results:
+            self.assertEqual(stats['filled'], 3)
+            self.assertEqual(len(stats['times']), 3)
+            self.assertLessEqual(stats['min'], stats['median'])
+            self.assertLessEqual(stats['median'], stats['p90'])
+            self.assertLessEqual(stats['p90'], stats['max'])
+            self.assertGreater(stats['peak_memory'], 0)
+
+        case = {'grid': '5x.txt', 'strategy': 'mlb', 'k': 5, 'median': 1.0, 'filled': 3}
+        self.assertEqual(sw.compare_benchmark([case], [{**case, 'median': 0.9}], 0.25), [])
+        self.assertEqual(len(sw.compare_benchmark([case], [{**case, 'median': 0.5}], 0.25)), 1)
+        self.assertEqual(len(sw.compare_benchmark([case], [{**case, 'filled': 4}], 0.25)), 1)
+        self.assertEqual(sw.compare_benchmark([case], [{**case, 'k': 10, 'median': 0.5}], 0.25), [])
+        self.assertEqual(sw.compare_benchmark([{**case, 'median': 0.002}], [{**case, 'median': 0.001}], 0.25), [])
+
+
+class TestSearchPauseAndResume(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        search = sw.Search(sw.MinlookFiller(5, seed=0), crossword, wordlist)
+
+        self.assertIsNone(search.run(max_nodes=3))
+        self.assertEqual(search.nodes, 3)
+        for slot, word in search.assignments():
+            self.assertEqual(crossword.words[slot], word)
+
+        self.assertTrue(search.run())
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestSearchUndo(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        slot = ((0, 0), (0, 1), (0, 2), (0, 3), (0, 4))
+        crossing_slot = ((0, 0), (1, 0), (2, 0), (3, 0), (4, 0))
+
+        mark = crossword.mark()
+        crossword.put_word('SCROD', slot)
+        crossword.put_word('SORTS', crossing_slot)
+        self.assertEqual(crossword.words[slot], 'SCROD')
+        self.assertIn('SORTS', crossword.wordset)
+
+        self.assertEqual(set(crossword.undo(mark)), set(slot) | set(crossing_slot))
+        self.assertEqual(crossword.words[slot], '.....')
+        self.assertEqual(crossword.words[crossing_slot], '.....')
+        self.assertFalse(crossword.wordset)
+
+
+class TestSearchStats(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        wordlist = sw.read_wordlist(WORDLIST)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        stats = sw.SearchStats()
+
+        search = sw.Search(sw.DFSFiller(), crossword, wordlist, stats=stats)
+        self.assertTrue(search.run())
+        self.assertTrue(stats.status)
+        self.assertEqual(stats.nodes, search.nodes)
+        self.assertEqual(stats.backtracks, search.backtracks)
+        self.assertEqual(stats.candidates, search.nodes - 1 + sum(stats.rejections.values()))
+        self.assertGreater(stats.get_matches_calls, 0)
+        self.assertLessEqual(stats.get_matches_hits, stats.get_matches_calls)
+        self.assertLessEqual(sum(stats.seconds.values()), stats.total_seconds)
+
+        slot = ((0, 0), (0, 1), (0, 2), (0, 3), (0, 4))
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        crossword.put_word('SCROD', slot)
+        down_slot = ((0, 1), (1, 1), (2, 1), (3, 1), (4, 1))
+        self.assertEqual(sw.Filler.rejection_reason(crossword, wordlist, down_slot, 'XXXXX'), sw.INVALID_WORD)
+        self.assertEqual(sw.Filler.rejection_reason(crossword, wordlist, down_slot, 'SCROD'), sw.DUPE)
+        self.assertIsNone(sw.Filler.rejection_reason(crossword, wordlist, down_slot, 'CASTS'))
+
+
+class EventCounter(sw.SearchObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_node(self, search):
+        self.events.append('node')
+
+    def on_place(self, search, slot, word):
+        self.events.append('place' if search.crossword.words[slot] == word else 'misplace')
+
+    def on_backtrack(self, search, failed_slot, resume_depth):
+        self.events.append('backtrack')
+
+    def on_solution(self, search):
+        self.events.append('solution')
+
+
+class TestSearchObservers(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        wordlist = sw.read_wordlist(WORDLIST)
+        counter = EventCounter()
+        trace = io.StringIO()
+        animation = io.StringIO()
+
+        search = sw.Search(
+            sw.MinlookBackjumpFiller(5),
+            sw.AmericanCrossword.from_grid(grid),
+            wordlist,
+            observers=[counter, sw.TraceWriter(trace), sw.AnimationRenderer(fps=0.01, out=animation)],
+        )
+        self.assertTrue(search.run())
+
+        self.assertEqual(counter.events.count('node'), search.nodes)
+        self.assertEqual(counter.events.count('backtrack'), search.backtracks)
+        self.assertEqual(counter.events[-1], 'solution')
+        self.assertNotIn('misplace', counter.events)
+
+        events = [json.loads(line) for line in trace.getvalue().splitlines()]
+        self.assertEqual(events[0]['event'], 'start')
+        self.assertEqual(events[-1]['event'], 'solution')
+        self.assertEqual(len(events), len(counter.events) + 1)
+
+        # the first node and the solution are drawn, the nodes in between are throttled
+        self.assertEqual(animation.getvalue().count(sw.utils.CLEAR_TERMINAL), 2)
+        self.assertTrue(animation.getvalue().endswith(str(search.crossword) + '\n'))
+
+
+class TestCrosswordIds(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+
+        for slot_id, slot in enumerate(crossword.slot_list):
+            self.assertEqual(crossword.slot_ids[slot], slot_id)
+            self.assertEqual(
+                [crossword.square_list[square_id] for square_id in crossword.slot_squares[slot_id]],
+                list(slot),
+            )
+
+            triples = iter(crossword.slot_crossings[slot_id])
+            for crossing_id, i, crossing_i in zip(triples, triples, triples):
+                crossing_slot = crossword.slot_list[crossing_id]
+                self.assertIn(slot[i], crossword.crossings[slot][crossing_slot])
+                self.assertEqual(crossing_slot[crossing_i], slot[i])
+                self.assertEqual(crossword.squares[slot[i]][crossing_slot], crossing_i)
+
+        self.assertTrue(all(span is not None for span in crossword.slot_spans))
+
+        word = 'A' * len(crossword.slot_list[0])
+        crossword.put_word(word, crossword.slot_list[0])
+        for slot_id, slot in enumerate(crossword.slot_list):
+            letters = ''.join(
+                chr(crossword.letters[square_id]) for square_id in crossword.slot_squares[slot_id]
+            )
+            self.assertEqual(crossword.words[slot], letters)
+            self.assertEqual(crossword.slot_empties[slot_id], letters.count(sw.EMPTY))
+        self.assertEqual(crossword.wordset, {word})
+
+
+class TestSeededReplay(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        grid = sw.read_grid(GRID_15x)
+
+        def fill(filler):
+            crossword = sw.AmericanCrossword.from_grid(grid)
+            search = sw.Search(filler, crossword, wordlist, nogoods=sw.NogoodStore())
+            search.run()
+            return crossword.get_grid(), search.nodes, search.backtracks
+
+        self.assertEqual(fill(sw.ConflictBackjumpFiller(7)), fill(sw.ConflictBackjumpFiller(random.Random(7))))
+
+        recorder = sw.RecordingFiller(sw.MinlookBackjumpFiller(5, seed=3))
+        recorded = fill(recorder)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, 'decisions.json')
+            recorder.save(filepath)
+            replayer = sw.ReplayFiller.from_file(sw.MinlookBackjumpFiller(5, seed=4), filepath)
+            with self.assertRaises(ValueError):
+                sw.ReplayFiller.from_file(sw.DFSFiller(), filepath)
+        self.assertEqual(fill(replayer), recorded)
+
+        # a replay cut short of the recorded search stops where the decisions run out
+        with self.assertRaises(sw.RetryException):
+            fill(sw.ReplayFiller(sw.MinlookBackjumpFiller(5), recorder.decisions[:10]))
+
+
+class TestSeedAcrossHashSeeds(unittest.TestCase):
+    def runTest(self):
+        # string hashing is randomized per process, so a seed only reproduces a search if match order doesn't depend on it
+        script = (
+            'import swordsmith as sw\n'
+            f'wordlist = sw.read_wordlist({WORDLIST!r})\n'
+            'for filler in [sw.DFSFiller(1), sw.MinlookFiller(5, seed=1), sw.ArcConsistencyFiller(1)]:\n'
+            f'    crossword = sw.AmericanCrossword.from_grid(sw.read_grid({GRID_5x!r}))\n'
+            '    search = sw.Search(filler, crossword, wordlist)\n'
+            '    search.run(2000)\n'
+            '    print(search.status, search.nodes, crossword.get_grid())\n'
+        )
+
+        def run(hash_seed):
+            env = dict(os.environ, PYTHONHASHSEED=str(hash_seed), PYTHONPATH='../swordsmith')
+            return subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True).stdout
+
+        self.assertEqual(run(1), run(2))
+
+
+class TestIterFills(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+
+        grids = []
+        for filled in sw.MinlookBackjumpFiller(5, seed=0).iter_fills(crossword, wordlist, max_fills=4, min_distance=10):
+            self.assertTrue(filled.is_validly_filled(wordlist))
+            grids.append(filled.get_grid())
+        self.assertEqual(len(grids), 4)
+
+        for i, grid in enumerate(grids):
+            for other_grid in grids[:i]:
+                distance = sum(a != b for row, other_row in zip(grid, other_grid) for a, b in zip(row, other_row))
+                self.assertGreaterEqual(distance, 10)
+
+        # a grid that's already filled has no other fill
+        prefilled = sw.AmericanCrossword.from_grid(grids[0])
+        self.assertEqual(len(list(sw.DFSFiller().iter_fills(prefilled, wordlist))), 1)
+
+        # backjumping fillers find every fill too, even across blocks that don't cross each other
+        def square(rows):
+            return rows + [''.join(column) for column in zip(*rows)]
+
+        wordlist = sw.Wordlist(
+            square(['ABC', 'DEF', 'GHI']) + square(['JKL', 'MNO', 'PQR'])
+            + square(['ABCD', 'EFGH', 'IJKL', 'MNOP']) + square(['QRST', 'UVWX', 'YZAB', 'CDEF'])
+        )
+        grid = [list(row) for row in ['... ....', '... ....', '... ....', '    ....']]
+
+        def fills(filler):
+            crossword = sw.AmericanCrossword.from_grid(grid)
+            return {tuple(map(tuple, filled.get_grid())) for filled in filler.iter_fills(crossword, wordlist)}
+
+        dfs_fills = fills(sw.DFSFiller(seed=0))
+        self.assertEqual(len(dfs_fills), 16)
+        for seed in range(4):
+            self.assertEqual(fills(sw.ConflictBackjumpFiller(seed=seed)), dfs_fills)
+
+
+class TestFillAsync(unittest.TestCase):
+    def runTest(self):
+        wordlist = sw.read_wordlist(WORDLIST)
+        crossword = sw.AmericanCrossword.from_grid(sw.read_grid(GRID_5x))
+        open_crossword = sw.AmericanCrossword.from_grid(['.' * 15] * 15)
+        progress = []
+
+        async def fill_both():
+            filled = sw.MinlookFiller(5).fill_async(
+                crossword, wordlist, nodes_per_yield=1, progress=lambda search: progress.append(search.nodes)
+            )
+            # an open 15x15 can't be filled in time, so its search is cancelled while the other runs
+            unfillable = asyncio.wait_for(sw.DFSFiller().fill_async(open_crossword, wordlist), timeout=0.5)
+            return await asyncio.gather(filled, unfillable, return_exceptions=True)
+
+        filled, unfillable = asyncio.run(fill_both())
+        self.assertTrue(filled)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+        self.assertEqual(progress, list(range(1, len(progress) + 1)))
+        self.assertIsInstance(unfillable, asyncio.TimeoutError)
+        self.assertFalse(open_crossword.is_filled())
+
+
+class TestDeepSearch(unittest.TestCase):
+    def runTest(self):
+        # more slots than the default recursion limit, so a recursive filler would overflow
+        grid = ['... ... ...', ' ' * 11] * 367
+        crossword = sw.AmericanCrossword.from_grid(grid[:-1], all_checked=False)
+        wordlist = sw.read_wordlist(WORDLIST)
+        self.assertGreater(len(crossword.slots), sys.getrecursionlimit())
+
+        sw.DFSFiller().fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestSlotTracker(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_15x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST)
+        search = sw.Search(sw.MinlookFiller(5, seed=0), crossword, wordlist)
+
+        while search.run(max_nodes=1) is None:
+            self.assertEqual(
+                search.tracker.fewest_matches(),
+                sw.Filler.fewest_matches(crossword, wordlist),
+            )
+        self.assertTrue(crossword.is_filled())
+
+
+class TestConstraintsArcConsistency(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        crossword.add_constraint(
+            ((0, 0), (0, 1), (0, 2), (0, 3), (0, 4)), r'^[^AEIOUY]*$'
+        )
+        wordlist = sw.read_wordlist(WORDLIST)
+        filler = sw.ArcConsistencyFiller()
+
+        filler.fill(crossword, wordlist, animate=False)
+        self.assertTrue(crossword.is_validly_filled(wordlist))
+
+
+class TestConstraintMatches(unittest.TestCase):
+    def runTest(self):
+        regexes = [
+            r'^[^AEIOUY]*$',
+            r'^S',
+            r'ING$',
+            r'^A.[B-DZ]..$',
+            r'Q[^U]',
+            r'^(AB|CD)',
+            r'^[AEIOU]+$',
+        ]
+        for index in sw.INDEXES:
+            wordlist = sw.read_wordlist(WORDLIST, index=index)
+            for regex in regexes:
+                for length in [3, 5, 7]:
+                    expected = {
+                        word
+                        for word in wordlist.words
+                        if len(word) == length and re.search(regex, word)
+                    }
+                    self.assertEqual(wordlist.get_constraint_matches(regex, length), expected)
+                    self.assertEqual(
+                        set(wordlist.get_matches('S' + '.' * (length - 1), regex)),
+                        {word for word in expected if word[0] == 'S'},
+                    )
+
+            wordlist.add_word('SQXXING')
+            self.assertIn('SQXXING', wordlist.get_constraint_matches(r'ING$', 7))
+            self.assertNotIn('SQXXING', wordlist.get_constraint_matches(r'^A.[B-DZ]..$', 7))
+            wordlist.remove_word('SQXXING')
+            self.assertNotIn('SQXXING', wordlist.get_constraint_matches(r'ING$', 7))
+
+
+class TestArcConsistencyPropagation(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.read_wordlist(WORDLIST, index='bitset')
+        filler = sw.ArcConsistencyFiller()
+        search = sw.Search(filler, crossword, wordlist)
+
+        slot = ((0, 0), (0, 1), (0, 2), (0, 3), (0, 4))
+        crossing_id = crossword.slot_ids[((0, 0), (1, 0), (2, 0), (3, 0), (4, 0))]
+        mark = search.domains.mark()
+
+        self.assertTrue(filler.place(search, slot, 'SCROD'))
+        crossing_words = wordlist.index.decode(5, search.domains[crossing_id])
+        self.assertTrue(crossing_words)
+        self.assertTrue(all(word[0] == 'S' for word in crossing_words))
+
+        search.domains.undo(mark)
+        crossing_words = wordlist.index.decode(5, search.domains[crossing_id])
+        self.assertTrue(any(word[0] != 'S' for word in crossing_words))
+
+        # domains are all the filler chooses slots by, so the search keeps no slot tracker for it
+        self.assertIsNone(search.tracker)
+
+
+class TestConflictBackjumpUnfillable(unittest.TestCase):
+    def runTest(self):
+        # no 3x3 square can be made out of these words
+        grid = ['...', '...', '...']
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        wordlist = sw.Wordlist(['ABC', 'ADE', 'BFG', 'CHI', 'DEF', 'XYZ'])
+        filler = sw.ConflictBackjumpFiller()
+        search = sw.Search(filler, crossword, wordlist)
+
+        self.assertFalse(search.run())
+        self.assertTrue(all(word == '...' for word in crossword.words.values()))
+        self.assertTrue(all(skipped > 0 for skipped in search.backjumps))
+
+
+class TestNogoodsAcrossSearches(unittest.TestCase):
+    def runTest(self):
+        grid = ['...', '...', '...']
+        wordlist = sw.Wordlist(['ABC', 'ADE', 'BFG', 'CHI', 'DEF', 'XYZ'])
+        for filler in [sw.DFSFiller(), sw.ConflictBackjumpFiller()]:
+            crossword = sw.AmericanCrossword.from_grid(grid)
+            nogoods = sw.NogoodStore()
+            first_search = sw.Search(filler, crossword, wordlist, nogoods=nogoods)
+            self.assertFalse(first_search.run())
+            self.assertTrue(nogoods.unsatisfiable)
+
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        second_search = sw.Search(sw.DFSFiller(), crossword, wordlist, nogoods=nogoods)
+        self.assertFalse(second_search.run())
+        self.assertEqual(second_search.nodes, 1)
+
+
+class TestNogoodRejectedFrame(unittest.TestCase):
+    def runTest(self):
+        # every match of some frame gets rejected as a dupe, which the frame's setters alone don't explain
+        cases = [
+            (sw.ConflictBackjumpFiller, 'AAA ABA ABB ACC BAA BBB BCB BCC CAA CAB CCC'),
+            (sw.DFSFiller, 'ABA ABC ACC BBC CAA CAC CBA CBC'),
+        ]
+        for filler_class, words in cases:
+            wordlist = sw.Wordlist(words.split())
+            nogoods = sw.NogoodStore()
+            for seed in range(20):
+                crossword = sw.AmericanCrossword.from_grid(['...'] * 3)
+                self.assertTrue(sw.Search(filler_class(seed), crossword, wordlist, nogoods=nogoods).run())
+                self.assertTrue(crossword.is_validly_filled(wordlist))
+            self.assertFalse(nogoods.unsatisfiable)
+
+
+class TestNogoodViolation(unittest.TestCase):
+    def runTest(self):
+        grid = sw.read_grid(GRID_5x)
+        crossword = sw.AmericanCrossword.from_grid(grid)
+        slot = ((0, 0), (0, 1), (0, 2), (0, 3), (0, 4))
+        crossing_slot = ((0, 0), (1, 0), (2, 0), (3, 0), (4, 0))
+
+        nogoods = sw.NogoodStore(max_size=1)
+        nogoods.add([(slot, 'SCROD'), (crossing_slot, 'SORTS')])
+        self.assertIsNone(nogoods.violation(crossword, crossing_slot, 'SORTS'))
+
+        crossword.put_word('SCROD', slot)
+        self.assertIsNotNone(nogoods.violation(crossword, crossing_slot, 'SORTS'))
+        self.assertIsNone(nogoods.violation(crossword, crossing_slot, 'SOAPS'))
+
+        nogoods.add([(slot, 'TAUPE')])
+        self.assertEqual(len(nogoods), 1)
+        self.assertIsNone(nogoods.violation(crossword, crossing_slot, 'SORTS'))
+
+
 unittest.main()